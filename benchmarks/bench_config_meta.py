@@ -0,0 +1,157 @@
+"""
+Startup and lookup cost of ConfigMeta.
+
+Measures:
+    - class creation time for .ini and .json files with 10 to 10,000 keys spread over 1 to 100 sections
+    - find_file time when the file sits 0 to N directories above the config_meta module (and when it is missing)
+    - per-call latency of a section get() with and without cast, cached and cold, against a plain attribute read
+
+Run from the repository root:
+    python -m benchmarks.bench_config_meta [--quick] [--output results.json]
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import load_module, ns_per_call, parse_args, report, seconds_per_call
+
+config_meta = load_module("07_July.config_meta")
+ConfigMeta = config_meta.ConfigMeta
+
+KEY_COUNTS = (10, 100, 1_000, 10_000)
+FIND_FILE_DEPTH = 6
+SECTION_COUNTS = (1, 10, 100)
+
+
+def generate_sections(n_keys: int, n_sections: int) -> dict[str, dict[str, str]]:
+    n_sections = min(n_sections, n_keys)
+    sections = {"Globals": {"log_level": "INFO", "timeout": "30"}}
+    for section_idx in range(n_sections):
+        sections[f"section_{section_idx}"] = {}
+    for key_idx in range(n_keys):
+        sections[f"section_{key_idx % n_sections}"][f"key_{key_idx}"] = str(key_idx)
+    return sections
+
+
+def write_config(directory: Path, fmt: str, sections: dict[str, dict[str, str]]) -> Path:
+    path = directory / f"config.{fmt}"
+    if fmt == "json":
+        path.write_text(json.dumps(sections))
+    else:
+        lines = []
+        for section_name, values in sections.items():
+            lines.append(f"[{section_name}]")
+            lines.extend(f"{key} = {value}" for key, value in values.items())
+            lines.append("")
+        path.write_text("\n".join(lines))
+    return path
+
+
+def bench_class_creation(directory: Path, key_counts, repeat: int) -> list[dict]:
+    results = []
+    for fmt in ("ini", "json"):
+        for n_keys in key_counts:
+            for n_sections in SECTION_COUNTS:
+                if n_sections > n_keys:
+                    continue
+                path = write_config(directory, fmt, generate_sections(n_keys, n_sections))
+                namespace = {"ConfigMeta": ConfigMeta, "sources": [path]}
+                seconds = seconds_per_call(
+                    'ConfigMeta("Config", (), {}, config_sources=sources).snapshot', namespace, repeat=repeat
+                )
+                results.append(
+                    {
+                        "benchmark": "class_creation",
+                        "format": fmt,
+                        "keys": n_keys,
+                        "sections": n_sections,
+                        "file_bytes": path.stat().st_size,
+                        "ms": round(seconds * 1e3, 4),
+                    }
+                )
+    return results
+
+
+def bench_find_file(directory: Path, number: int) -> list[dict]:
+    """
+    find_file walks up from the directory of the config_meta module, so the depth is the number of parents walked.
+    The module is pointed at a directory ladder under `directory` for the run, so nothing is written to the repository.
+    """
+    results = []
+    module_dir = directory.resolve().joinpath(*(f"level_{level}" for level in range(FIND_FILE_DEPTH)))
+    module_dir.mkdir(parents=True)
+    ancestors = [module_dir, *module_dir.parents][: FIND_FILE_DEPTH + 1]
+    directory_name = f"_bench_find_file_{id(results)}"
+    namespace = {"find_file": config_meta.find_file, "directory_name": directory_name}
+
+    module_file = config_meta.__file__
+    config_meta.__file__ = str(module_dir / "config_meta.py")
+    try:
+        for depth, ancestor in enumerate(ancestors):
+            config_dir = ancestor / directory_name
+            config_dir.mkdir()
+            try:
+                (config_dir / "config.ini").write_text("[Globals]\n")
+                ns = ns_per_call('find_file("config.ini", directory_name)', namespace, number=number)
+            finally:
+                shutil.rmtree(config_dir)
+            results.append({"benchmark": "find_file", "depth": depth, "found": True, "us": round(ns / 1e3, 3)})
+
+        ns = ns_per_call(
+            "try:\n    find_file('config.ini', directory_name)\nexcept FileNotFoundError:\n    pass",
+            namespace,
+            number=number,
+        )
+    finally:
+        config_meta.__file__ = module_file
+    results.append(
+        {"benchmark": "find_file", "depth": len(module_dir.parents), "found": False, "us": round(ns / 1e3, 3)}
+    )
+    return results
+
+
+def bench_get(directory: Path, key_counts, number: int) -> list[dict]:
+    results = []
+    for n_keys in key_counts:
+        path = write_config(directory, "ini", generate_sections(n_keys, 10))
+        Config = ConfigMeta("Config", (), {}, config_sources=[path])
+        section = Config.section_0
+        namespace = {"Config": Config, "section": section}
+        statements = {
+            "attribute": "section.key_0",
+            "get": 'section.get("key_0")',
+            "get_global": 'section.get("timeout")',
+            "get_default": 'section.get("missing", default="x")',
+            "get_cast_int": 'section.get("key_0", cast=int)',
+            "get_int": 'section.get_int("key_0")',
+            "get_cast_int_cold": 'Config.cache_clear(); section.get("key_0", cast=int)',
+            "cache_clear": "Config.cache_clear()",
+        }
+        for name, stmt in statements.items():
+            ns = ns_per_call(stmt, namespace, number=number)
+            results.append({"benchmark": "section_get", "call": name, "keys": n_keys, "ns": round(ns, 1)})
+    return results
+
+
+def main() -> None:
+    args = parse_args(__doc__.strip().splitlines()[0])
+    key_counts = KEY_COUNTS[:2] if args.quick else KEY_COUNTS
+    number = 10_000 if args.quick else 200_000
+
+    directory = Path(tempfile.mkdtemp(prefix="bench_config_meta_"))
+    try:
+        results = [
+            *bench_class_creation(directory, key_counts, repeat=3 if args.quick else 7),
+            *bench_find_file(directory, number=200 if args.quick else 2_000),
+            *bench_get(directory, key_counts, number),
+        ]
+    finally:
+        shutil.rmtree(directory)
+
+    report("config_meta", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Set and get throughput of DescriptorRegistry.
+
+Compares the registry with a weakref.WeakKeyDictionary and with plain instance __dict__ storage,
+used directly and behind a data descriptor, and with the registry as it was before the weak reference
+and the entry of an instance were reused on re-set (a new closure and weakref.ref per assignment),
+and without the identity check of the lookups (keyed on the id only, which may read a stale entry).
+Also compares ColumnRegistry with DescriptorRegistry for a numeric field on many instances:
+memory per instance and the time to sum, filter and sort all the values.
+The bulk get_many/set_many against a loop of single gets/sets over 10,000 instances.
+Finally, the set/get throughput of ThreadSafeDescriptorRegistry (1 and 16 stripes) with 1 to 8 threads,
+each working on its own instances. Threads only run in parallel on a free-threaded build ("gil_enabled": false).
+
+Run from the repository root:
+    python -m benchmarks.bench_descriptor_registry [--quick] [--output results.json]
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+
+from benchmarks.common import (
+    allocated_bytes_per_call,
+    load_module,
+    ns_per_call,
+    parse_args,
+    report,
+    seconds_per_call,
+)
+
+descriptor_registry = load_module("08_August.descriptor_registry")
+DescriptorRegistry = descriptor_registry.DescriptorRegistry
+ColumnRegistry = descriptor_registry.ColumnRegistry
+ThreadSafeDescriptorRegistry = descriptor_registry.ThreadSafeDescriptorRegistry
+
+
+class LegacyRegistry(DescriptorRegistry):
+    """The previous __setitem__: a new remove closure and weak reference on every assignment"""
+
+    def __setitem__(self, key, value):
+        obj_id = id(key)
+
+        def remove(_):
+            self._data.pop(obj_id, None)
+
+        self._data[obj_id] = [weakref.ref(key, remove), value]
+
+
+class UncheckedRegistry(DescriptorRegistry):
+    """The lookups keyed on the id only, without checking the referent of the weak reference"""
+
+    def __setitem__(self, key, value):
+        obj_id = id(key)
+        entry = self._data.get(obj_id)
+        if entry is not None:
+            entry[1] = value
+        else:
+            self._data[obj_id] = [weakref.KeyedRef(key, self._remove, obj_id), value]
+
+    def __getitem__(self, key):
+        entry = self._data.get(id(key))
+        if entry is None:
+            raise KeyError(f"{key} not found in storage")
+        return entry[1]
+
+
+class DictStorage:
+    """Stores the values in the instance __dict__, the usual descriptor storage"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __setitem__(self, instance, value):
+        instance.__dict__[self._name] = value
+
+    def __getitem__(self, instance):
+        return instance.__dict__[self._name]
+
+
+def storage_field(storage):
+    """A data descriptor keeping its values in the given storage"""
+
+    class Field:
+        def __get__(self, instance, owner):
+            if instance is None:
+                return self
+            return storage[instance]
+
+        def __set__(self, instance, value):
+            storage[instance] = value
+
+    return Field()
+
+
+class Record:
+    pass
+
+
+def make_storages():
+    return {
+        "descriptor_registry": DescriptorRegistry(),
+        "legacy_registry": LegacyRegistry(),
+        "unchecked_registry": UncheckedRegistry(),
+        "weak_key_dictionary": weakref.WeakKeyDictionary(),
+        "instance_dict": DictStorage("_value"),
+    }
+
+
+def bytes_per_instance(registry_type, objects: list) -> float:
+    """The memory held by a registry filled with one float per object, divided by the number of objects"""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        registry = registry_type()
+        for index, obj in enumerate(objects):
+            registry[obj] = index * 0.5
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (after - before) / len(objects)
+
+
+def bench_column(count: int) -> list[dict]:
+    objects = [Record() for _ in range(count)]
+    results = []
+    for registry_type in (DescriptorRegistry, ColumnRegistry):
+        registry = registry_type()
+        for index, obj in enumerate(objects):
+            registry[obj] = index * 0.5
+        namespace = {"registry": registry, "limit": count / 4}
+        if registry_type is ColumnRegistry:
+            bulk = {
+                "sum": "registry.sum()",
+                "filter": "registry.filter(lambda value: value < limit)",
+                "sort": "registry.sort(reverse=True)",
+            }
+            if descriptor_registry.numpy is not None:
+                bulk["mask"] = "registry.mask(lambda values: values < limit)"
+        else:
+            bulk = {
+                "sum": "sum(registry.values())",
+                "filter": "[obj for obj, value in registry.items() if value < limit]",
+                "sort": "sorted(registry.items(), key=lambda item: item[1], reverse=True)",
+            }
+        result = {
+            "benchmark": "numeric_column",
+            "registry": registry_type.__name__,
+            "instances": count,
+            "bytes_per_instance": round(bytes_per_instance(registry_type, objects), 1),
+        }
+        for operation, stmt in bulk.items():
+            result[f"{operation}_ms"] = round(seconds_per_call(stmt, namespace) * 1e3, 3)
+        results.append(result)
+    return results
+
+
+def bench_bulk(count: int = 10_000) -> list[dict]:
+    objects = [Record() for _ in range(count)]
+    values = list(range(count))
+    results = []
+    for registry in (DescriptorRegistry(), ThreadSafeDescriptorRegistry(), ColumnRegistry()):
+        registry.set_many(zip(objects, values, strict=True))
+        namespace = {"registry": registry, "objects": objects, "values": values, "zip": zip}
+        loop_set = "for obj, value in zip(objects, values):\n    registry[obj] = value"
+        results.append(
+            {
+                "benchmark": "bulk",
+                "registry": registry.__class__.__name__,
+                "instances": count,
+                "loop_set_ms": round(seconds_per_call(loop_set, namespace, number=5) * 1e3, 3),
+                "set_many_ms": round(
+                    seconds_per_call("registry.set_many(zip(objects, values))", namespace, 5) * 1e3, 3
+                ),
+                "loop_get_ms": round(seconds_per_call("[registry[obj] for obj in objects]", namespace, 5) * 1e3, 3),
+                "get_many_ms": round(seconds_per_call("registry.get_many(objects)", namespace, number=5) * 1e3, 3),
+            }
+        )
+    return results
+
+
+def set_get_loop(registry, objects: list, rounds: int) -> None:
+    for round_ in range(rounds):
+        for obj in objects:
+            registry[obj] = round_
+            registry[obj]
+
+
+def threaded_ops_per_second(registry, threads: int, rounds: int) -> float:
+    """Set and get operations per second, with each thread working on its own 100 instances"""
+    objects = [[Record() for _ in range(100)] for _ in range(threads)]
+    workers = [threading.Thread(target=set_get_loop, args=(registry, own, rounds)) for own in objects]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return 2 * 100 * rounds * threads / (time.perf_counter() - start)
+
+
+def bench_threads(rounds: int) -> list[dict]:
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    results = []
+    for name, make_registry in (
+        ("descriptor_registry (unsafe)", DescriptorRegistry),
+        ("thread_safe_1_stripe", lambda: ThreadSafeDescriptorRegistry(stripes=1)),
+        ("thread_safe_16_stripes", lambda: ThreadSafeDescriptorRegistry(stripes=16)),
+    ):
+        for threads in (1, 2, 4, 8):
+            results.append(
+                {
+                    "benchmark": "threads",
+                    "registry": name,
+                    "threads": threads,
+                    "gil_enabled": gil_enabled,
+                    "ops_per_second": round(threaded_ops_per_second(make_registry(), threads, rounds)),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    args = parse_args(__doc__.strip().splitlines()[0])
+    number = 20_000 if args.quick else 500_000
+
+    results = []
+    for name, storage in make_storages().items():
+        owner = type("Owner", (), {"value": storage_field(storage)})
+        obj, instance = Record(), owner()
+        storage[obj] = 0
+        instance.value = 0
+        namespace = {"storage": storage, "obj": obj, "instance": instance}
+        results.append(
+            {
+                "benchmark": "set_get",
+                "storage": name,
+                "set_ns": round(ns_per_call("storage[obj] = 1", namespace, number=number), 1),
+                "get_ns": round(ns_per_call("storage[obj]", namespace, number=number), 1),
+                "descriptor_set_ns": round(ns_per_call("instance.value = 1", namespace, number=number), 1),
+                "descriptor_get_ns": round(ns_per_call("instance.value", namespace, number=number), 1),
+                "set_allocated_bytes": allocated_bytes_per_call("storage[obj] = 1", namespace),
+            }
+        )
+
+    results.extend(bench_column(10_000 if args.quick else 200_000))
+    results.extend(bench_bulk())
+    results.extend(bench_threads(100 if args.quick else 2_000))
+
+    report("descriptor_registry", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Dispatcher against the alternatives for a hot router.
+
+For registry sizes from 4 to 10,000 keys, compares the time and the memory allocated per call of:
+    - value keys: Dispatcher by index, by key_names, with a key_generator, as a method and frozen,
+      against a plain dict of callables and a match statement with one case per key;
+    - type keys: Dispatcher with by_type=True against functools.singledispatch, a dict indexed by type
+      and a match statement with one class pattern per type.
+The key looked up is in the middle of the registry, the average position for the linear match statements.
+
+Run from the repository root:
+    python -m benchmarks.bench_dispatch_alternatives [--quick] [--output results.json]
+"""
+
+from collections.abc import Callable
+from functools import singledispatch
+from operator import itemgetter
+
+from benchmarks.common import allocated_bytes_per_call, load_module, ns_per_call, parse_args, report
+
+Dispatcher = load_module("07_July.dispatch").Dispatcher
+
+SIZES = (4, 16, 100, 1_000, 10_000)
+QUICK_SIZES = (4, 100, 10_000)
+
+
+def handler(*args, **kwargs):
+    return None
+
+
+def make_match(cases: list[str], namespace: dict) -> Callable:
+    """Generate a function with a match statement, one case per pattern, all calling the handler"""
+    lines = ["def route(key, payload):", "    match key:"]
+    for pattern in cases:
+        lines += [f"        case {pattern}:", "            return handler(key, payload)"]
+    lines += ["        case _:", "            return handler(key, payload)"]
+    exec("\n".join(lines), namespace)
+    return namespace["route"]
+
+
+def value_routers(size: int) -> dict[str, tuple[str, dict]]:
+    """name -> (statement, namespace) of a call routed on a string key"""
+    keys = [f"k{index}" for index in range(size)]
+    key = keys[size // 2]
+    table = dict.fromkeys(keys, handler)
+
+    by_index = Dispatcher(handler)
+    by_names = Dispatcher(handler, key_names="key")
+    by_generator = Dispatcher(handler, key_generator=itemgetter(0))
+    for dispatcher in (by_index, by_generator):
+        dispatcher.registry = dict(table)
+    by_names.registry = {(name,): handler for name in keys}
+    frozen = Dispatcher(handler)
+    frozen.registry = dict(table)
+
+    class Router:
+        route = Dispatcher(handler, key_idx=1)
+        route.registry = dict(table)
+
+    namespace = {
+        "key": key,
+        "record": (key, None),
+        "by_index": by_index,
+        "by_names": by_names,
+        "by_generator": by_generator,
+        "router": Router(),
+        "frozen": frozen.freeze(),
+        "table": table,
+        "handler": handler,
+        "match_route": make_match([repr(name) for name in keys], {"handler": handler}),
+    }
+    return {
+        "dispatcher_index": ("by_index(key, None)", namespace),
+        "dispatcher_key_names": ("by_names(key=key, payload=None)", namespace),
+        "dispatcher_key_generator": ("by_generator(record)", namespace),
+        "dispatcher_method": ("router.route(key, None)", namespace),
+        "dispatcher_frozen": ("frozen(key, None)", namespace),
+        "dict": ("table.get(key, handler)(key, None)", namespace),
+        "match": ("match_route(key, None)", namespace),
+    }
+
+
+def type_routers(size: int) -> dict[str, tuple[str, dict]]:
+    """name -> (statement, namespace) of a call routed on the type of the argument"""
+    classes = [type(f"Key{index}", (), {}) for index in range(size)]
+    table = dict.fromkeys(classes, handler)
+
+    by_type = Dispatcher(handler, by_type=True)
+    by_type.registry = dict(table)
+
+    single = singledispatch(handler)
+    for cls in classes:
+        single.register(cls, handler)
+
+    match_namespace = {f"Key{index}": cls for index, cls in enumerate(classes)} | {"handler": handler}
+    namespace = {
+        "value": classes[size // 2](),
+        "by_type": by_type,
+        "single": single,
+        "table": table,
+        "handler": handler,
+        "match_route": make_match([f"Key{index}()" for index in range(size)], match_namespace),
+    }
+    return {
+        "dispatcher_by_type": ("by_type(value, None)", namespace),
+        "singledispatch": ("single(value, None)", namespace),
+        "dict_by_type": ("table.get(type(value), handler)(value, None)", namespace),
+        "match_class": ("match_route(value, None)", namespace),
+    }
+
+
+def main() -> None:
+    args = parse_args(__doc__.strip().splitlines()[0])
+    sizes = QUICK_SIZES if args.quick else SIZES
+
+    results = []
+    for size in sizes:
+        # The match statements are linear, fewer iterations for the large registries
+        number = max(1_000, (20_000 if args.quick else 200_000) // max(1, size // 100))
+        for kind, routers in (("value", value_routers(size)), ("type", type_routers(size))):
+            for router, (stmt, namespace) in routers.items():
+                results.append(
+                    {
+                        "benchmark": "route",
+                        "keys": kind,
+                        "router": router,
+                        "size": size,
+                        "ns_per_call": round(ns_per_call(stmt, namespace, number=number), 1),
+                        "allocated_bytes_per_call": allocated_bytes_per_call(stmt, namespace),
+                    }
+                )
+
+    report("dispatch_alternatives", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Per-call overhead of Dispatcher.
+
+Compares a dispatched call (mutable and frozen) with a direct dict lookup of the same handlers,
+for every key extraction mode, and the compiled key extractors with the generic extraction Dispatcher used
+before they were introduced.
+Also measures the cost of a call with stats enabled, and a dispatcher used as a method against a plain method.
+
+Run from the repository root:
+    python -m benchmarks.bench_dispatcher [--quick] [--output results.json]
+"""
+
+import weakref
+
+from benchmarks.common import load_module, ns_per_call, parse_args, report
+
+Dispatcher = load_module("07_July.dispatch").Dispatcher
+
+
+def legacy_extract_key(self, args, kwargs):
+    """The generic extract_key, re-checking the settings on every call"""
+    if self.key_names:
+        missing_keys = self.key_names - kwargs.keys()
+        if missing_keys:
+            raise TypeError(f"Missing required keyword arguments: {missing_keys}.")
+        kws = {key: kwargs[key] for key in self.key_names}
+        if self.key_generator:
+            return self.key_generator(**kws)
+        return tuple(kws.values())
+    if self.key_generator:
+        return self.key_generator(args[self.key_idx])
+    if isinstance(self.key_idx, (tuple, list)):
+        return tuple((args[i] for i in self.key_idx))
+    return args[self.key_idx]
+
+
+def handler(*args, **kwargs):
+    return None
+
+
+def make_modes() -> dict[str, tuple[Dispatcher, tuple, dict]]:
+    """mode -> (dispatcher, positional arguments, keyword arguments) of a call that hits a registered key"""
+    by_index = Dispatcher(handler)
+    by_index.register("a")(handler)
+
+    by_indices = Dispatcher(handler, key_idx=[0, 1])
+    by_indices.register(("a", "b"))(handler)
+
+    by_generator = Dispatcher(handler, key_generator=type)
+    by_generator.register(str)(handler)
+
+    by_names = Dispatcher(handler, key_names=["x", "y"])
+    by_names.register(("a", "b"))(handler)
+
+    by_names_generator = Dispatcher(handler, key_names=["x", "y"], key_generator=lambda x, y: x + y)
+    by_names_generator.register("ab")(handler)
+
+    return {
+        "key_idx": (by_index, ("a", "b"), {}),
+        "key_idx_list": (by_indices, ("a", "b"), {}),
+        "key_generator": (by_generator, ("a", "b"), {}),
+        "key_names": (by_names, (), {"x": "a", "y": "b"}),
+        "key_names_generator": (by_names_generator, (), {"x": "a", "y": "b"}),
+    }
+
+
+class WeaklyBound:
+    """The alternative to a new bound method per lookup: a wrapper cached per instance, holding it weakly"""
+
+    __slots__ = ("func", "ref")
+
+    def __init__(self, func, instance):
+        self.func, self.ref = func, weakref.ref(instance)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(self.ref(), *args, **kwargs)
+
+
+class Greeter:
+    """A class with the same handler as a plain method and as a method-style dispatcher"""
+
+    def plain(self, name):
+        return None
+
+    dispatched = Dispatcher(handler, key_idx=1)
+    dispatched.register("a")(handler)
+
+
+def main() -> None:
+    args = parse_args(__doc__.strip().splitlines()[0])
+    number = 20_000 if args.quick else 500_000
+
+    results = []
+    for mode, (dispatcher, call_args, call_kwargs) in make_modes().items():
+        namespace = {
+            "d": dispatcher,
+            "table": dict(dispatcher.get_registry()),
+            "fallback": dispatcher.fallback,
+            "key": dispatcher.extract_key(call_args, call_kwargs),
+            "a": call_args,
+            "kw": call_kwargs,
+            "legacy_extract_key": legacy_extract_key,
+        }
+        call_ns = ns_per_call("d(*a, **kw)", namespace, number=number)
+        direct_ns = ns_per_call("table.get(key, fallback)(*a, **kw)", namespace, number=number)
+        namespace["frozen"] = dispatcher.freeze()
+        frozen_ns = ns_per_call("frozen(*a, **kw)", namespace, number=number)
+        results.append(
+            {
+                "benchmark": "call_overhead",
+                "mode": mode,
+                "dispatcher_ns": round(call_ns, 1),
+                "direct_dict_ns": round(direct_ns, 1),
+                "overhead_ns": round(call_ns - direct_ns, 1),
+                "frozen_ns": round(frozen_ns, 1),
+                "frozen_overhead_ns": round(frozen_ns - direct_ns, 1),
+            }
+        )
+        results.append(
+            {
+                "benchmark": "extract_key",
+                "mode": mode,
+                "compiled_ns": round(ns_per_call("d._extract_key(a, kw)", namespace, number=number), 1),
+                "legacy_ns": round(ns_per_call("legacy_extract_key(d, a, kw)", namespace, number=number), 1),
+            }
+        )
+
+    dispatcher, call_args, call_kwargs = make_modes()["key_idx"]
+    namespace = {"d": dispatcher, "a": call_args, "kw": call_kwargs}
+    stats_off_ns = ns_per_call("d(*a, **kw)", namespace, number=number)
+    dispatcher.stats = True
+    stats_on_ns = ns_per_call("d(*a, **kw)", namespace, number=number)
+    results.append(
+        {
+            "benchmark": "stats",
+            "mode": "key_idx",
+            "stats_off_ns": round(stats_off_ns, 1),
+            "stats_on_ns": round(stats_on_ns, 1),
+        }
+    )
+
+    greeter = Greeter()
+    namespace = {"g": greeter, "weakly_bound": WeaklyBound(Greeter.dispatched, greeter)}
+    results.append(
+        {
+            "benchmark": "method_call",
+            "mode": "key_idx",
+            "plain_method_ns": round(ns_per_call("g.plain('a')", namespace, number=number), 1),
+            "dispatcher_method_ns": round(ns_per_call("g.dispatched('a')", namespace, number=number), 1),
+            # Even without the lookup, the extra Python-level call costs more than allocating the bound method
+            "cached_weakly_bound_ns": round(ns_per_call("weakly_bound('a')", namespace, number=number), 1),
+        }
+    )
+
+    report("dispatcher", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Attribute read and write cost of the validated fields.
+
+One field holding a positive int, read and written (with a valid value) on an existing instance:
+a plain attribute (no validation), a property validating in its setter, a hand-written descriptor calling
+one validator object after the other around a DescriptorRegistry (the usual Typed/Positive descriptor),
+Field with the instance dict and with registry storage, and a pydantic model with validate_assignment.
+
+Run from the repository root:
+    python -m benchmarks.bench_validated_fields [--quick] [--output results.json]
+"""
+
+from benchmarks.common import load_module, ns_per_call, parse_args, report
+
+try:
+    import pydantic
+except ImportError:  # Optional, the pydantic model is skipped
+    pydantic = None
+
+validated_fields = load_module("08_August.validated_fields")
+DescriptorRegistry = load_module("08_August.descriptor_registry").DescriptorRegistry
+Field = validated_fields.Field
+Positive = validated_fields.Positive
+Typed = validated_fields.Typed
+Validated = validated_fields.Validated
+
+
+class Plain:
+    def __init__(self, value):
+        self.value = value
+
+
+class WithProperty:
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        if not isinstance(value, int):
+            raise TypeError("value must be an int")
+        if value <= 0:
+            raise ValueError("value must be positive")
+        self._value = value
+
+
+class IsInt:
+    def __call__(self, value):
+        if not isinstance(value, int):
+            raise TypeError("value must be an int")
+
+
+class IsPositive:
+    def __call__(self, value):
+        if value <= 0:
+            raise ValueError("value must be positive")
+
+
+class RegistryDescriptor:
+    """The hand-written descriptor: the validators are called one by one, the value kept in a registry"""
+
+    def __init__(self, *validators):
+        self.validators = validators
+        self.registry = DescriptorRegistry()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self.registry[instance]
+
+    def __set__(self, instance, value):
+        for validator in self.validators:
+            validator(value)
+        self.registry[instance] = value
+
+
+class HandWritten:
+    value = RegistryDescriptor(IsInt(), IsPositive())
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FieldDict(Validated):
+    value = Field(Typed(int), Positive())
+
+
+class FieldRegistry(Validated, storage="registry"):
+    value = Field(Typed(int), Positive())
+
+
+def make_models() -> dict[str, type]:
+    models = {
+        "plain_attribute": Plain,
+        "property": WithProperty,
+        "hand_written_descriptor": HandWritten,
+        "field_dict": FieldDict,
+        "field_registry": FieldRegistry,
+    }
+    if pydantic is not None:
+
+        class PydanticModel(pydantic.BaseModel):
+            model_config = pydantic.ConfigDict(validate_assignment=True)
+            value: pydantic.PositiveInt
+
+        models["pydantic"] = PydanticModel
+    return models
+
+
+def main() -> None:
+    args = parse_args(__doc__.strip().splitlines()[0])
+    number = 20_000 if args.quick else 500_000
+
+    results = []
+    for name, model in make_models().items():
+        namespace = {"instance": model(value=1), "model": model}
+        results.append(
+            {
+                "benchmark": "read_write",
+                "model": name,
+                "read_ns": round(ns_per_call("instance.value", namespace, number=number), 1),
+                "write_ns": round(ns_per_call("instance.value = 2", namespace, number=number), 1),
+                "create_ns": round(ns_per_call("model(value=3)", namespace, number=number // 10), 1),
+            }
+        )
+
+    report("validated_fields", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark is a plain script run from the repository root, e.g. `python -m benchmarks.bench_config_meta`,
+and prints (or writes with --output) its results as JSON, so runs on different machines or branches can be diffed.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+
+def load_module(name: str) -> ModuleType:
+    """Import a blog module the same way the tests do, e.g. load_module("07_July.dispatch")"""
+    return importlib.import_module(f"src.2025.{name}")
+
+
+def ns_per_call(stmt: str, namespace: dict[str, Any], number: int = 100_000, repeat: int = 5) -> float:
+    """
+    Time a statement with timeit and return the best time per execution in nanoseconds.
+    The statement is compiled into the timing loop, so no extra function call is measured.
+    """
+    timer = timeit.Timer(stmt, globals=namespace)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def seconds_per_call(stmt: str, namespace: dict[str, Any], number: int = 1, repeat: int = 5) -> float:
+    timer = timeit.Timer(stmt, globals=namespace)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def allocated_bytes_per_call(stmt: str, namespace: dict[str, Any], repeat: int = 5) -> int:
+    """
+    The memory allocated while the statement runs once (tracemalloc peak above the memory in use before),
+    the smallest of a few runs after a warm-up, minus the cost of running an empty statement the same way.
+    0 means that it only reuses freelists and existing objects.
+    """
+    return max(0, _peak_bytes(stmt, namespace, repeat) - _peak_bytes("pass", namespace, repeat))
+
+
+def _peak_bytes(stmt: str, namespace: dict[str, Any], repeat: int) -> int:
+    code = compile(stmt, "<benchmark>", "exec")
+    exec(code, namespace)  # warm-up: caches, lazy imports
+    tracemalloc.start()
+    try:
+        sizes = []
+        for _ in range(repeat):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            exec(code, namespace)
+            sizes.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return min(sizes)
+
+
+def parse_args(description: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON results to this file")
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes and iterations, for a smoke run")
+    return parser.parse_args()
+
+
+def report(suite: str, results: list[dict[str, Any]], output: Path | None = None) -> dict[str, Any]:
+    payload = {
+        "suite": suite,
+        "created": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2)
+    if output is None:
+        print(text)  # noqa: T201
+    else:
+        output.write_text(text)
+    return payload
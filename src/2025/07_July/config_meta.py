@@ -1,6 +1,29 @@
+import inspect
 import json
-from configparser import ConfigParser, SectionProxy
+import logging
+import os
+import sys
+import threading
+import weakref
+from configparser import ConfigParser
+from functools import cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Sequence
+
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+
+try:
+    import inotify_simple
+except ImportError:  # Optional, the watcher falls back to polling
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of values cached by the get() methods per snapshot, the cache is emptied when it is full
+GET_CACHE_SIZE = 4096
+
+_MISSING = object()
 
 
 def find_file(filename: str, directory_name: str | None = None) -> Path:
@@ -19,7 +42,110 @@ def find_file(filename: str, directory_name: str | None = None) -> Path:
     raise FileNotFoundError(f"{filename} not found")
 
 
-__all__ = ["ConfigMeta"]
+def read_config(config_path: Path) -> ConfigParser:
+    """Parse an .ini or .json configuration file into a ConfigParser."""
+    config = ConfigParser()
+    if config_path.suffix == ".json":
+        with open(config_path) as f:
+            config.read_dict(json.load(f))
+    else:
+        config.read(config_path)
+    return config
+
+
+def read_sections(config_path: Path) -> dict[str, dict[str, str]]:
+    """Parse an .ini or .json configuration file into plain dictionaries of (interpolated) string values."""
+    config = read_config(config_path)
+    return {section_name: dict(config[section_name]) for section_name in config.sections()}
+
+
+class EnvSource:
+    """
+    Description
+
+    A configuration source that reads environment variables named {prefix}{SECTION}{separator}{KEY}.
+    e.g. with prefix "APP_", the variable APP_DATABASE__HOST overrides the key host of the database section.
+
+    Section names are matched case-insensitively against the sections of the previous sources
+    (GLOBALS always maps to the Globals section). Keys are lower-cased, like ConfigParser does.
+
+    Attributes
+
+    prefix (str): The prefix that selects the environment variables.
+
+    separator (str): Separates the section from the key.
+    """
+
+    def __init__(self, prefix: str, separator: str = "__"):
+        self.prefix = prefix
+        self.separator = separator
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(prefix={self.prefix!r})"
+
+    def read(self, environ: Mapping[str, str] | None = None) -> dict[str, dict[str, str]]:
+        environ = os.environ if environ is None else environ
+        sections = {}
+        for name, value in environ.items():
+            if not name.startswith(self.prefix):
+                continue
+            section_name, separator, key = name[len(self.prefix) :].partition(self.separator)
+            if separator and section_name and key:
+                sections.setdefault(section_name, {})[key.lower()] = value
+        return sections
+
+
+def load_sources(sources) -> tuple[dict[str, dict[str, str]], dict[tuple[str, str], str]]:
+    """
+    Merge an ordered list of sources (Paths to .ini/.json files or EnvSource) section by section.
+    Later sources take precedence over earlier ones.
+
+    Returns:
+        The merged sections and, for every (section, key), the source its value came from.
+    """
+    merged = {}
+    origins = {}
+    for source in sources:
+        label = str(source)  # one string per source, so pickle memoizes it across all origins
+        if isinstance(source, EnvSource):
+            known = {section_name.casefold(): section_name for section_name in merged}
+            known.setdefault("globals", "Globals")
+            layer = {known.get(name.casefold(), name.casefold()): values for name, values in source.read().items()}
+        else:
+            layer = read_sections(source)
+
+        for section_name, values in layer.items():
+            merged.setdefault(section_name, {}).update(values)
+            origins.update(((section_name, key), label) for key in values)
+
+    return merged, origins
+
+
+def to_bool(value: Any) -> bool:
+    """Cast using the same boolean states as ConfigParser.getboolean ('1', 'yes', 'true', 'on' and their opposites)"""
+    if isinstance(value, bool):
+        return value
+    try:
+        return ConfigParser.BOOLEAN_STATES[str(value).lower()]
+    except KeyError:
+        raise ValueError(f"Not a boolean: {value!r}") from None
+
+
+def to_list(value: Any) -> tuple[str, ...]:
+    """Split a comma separated value. A tuple is returned so that cached values can not be mutated by the caller."""
+    if not isinstance(value, str):
+        return tuple(value)
+    return tuple(item for item in map(str.strip, value.split(",")) if item)
+
+
+def apply_cast(attr: str, value: Any, cast: Callable[[Any], Any]) -> Any:
+    try:
+        return cast(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Cannot cast {attr}={value!r} using {getattr(cast, '__name__', cast)}: {e}") from e
+
+
+__all__ = ["ConfigMeta", "ConfigSnapshot", "ConfigValidationError", "EnvSource", "install_snapshot"]
 
 
 class SectionType(type):
@@ -35,16 +161,448 @@ class SectionType(type):
 
     section_attrs (dict):
         Additional attributes corresponding to key-value pairs from the configuration file.
+
+    frozen (bool):
+        Whether the attributes of the section can not be set or deleted after the class is created.
     """
 
-    def __new__(mcls, name, bases, cls_attrs, section_name: str, section_attrs: dict | SectionProxy):
+    def __new__(
+        mcls, name, bases, cls_attrs, section_name: str, section_attrs: Mapping[str, Any], frozen: bool = False
+    ):
         cls_attrs["__doc__"] = f"Configurations for the {section_name} section"
         cls_attrs["section_name"] = section_name
         for key, value in section_attrs.items():
             cls_attrs[key] = value
+        cls_attrs["_frozen"] = frozen
 
         return super().__new__(mcls, name, bases, cls_attrs)
 
+    def __setattr__(cls, name, value):
+        if cls._frozen:
+            raise AttributeError(f"{cls.__name__} is frozen, can not set {name!r}")
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        if cls._frozen:
+            raise AttributeError(f"{cls.__name__} is frozen, can not delete {name!r}")
+        super().__delattr__(name)
+
+
+class ConfigValidationError(ValueError):
+    """Raised when a section does not match the schema declared for it on the configuration class"""
+
+    pass
+
+
+def resolve_annotations(obj: type) -> tuple[dict[str, Any], dict[str, Exception]]:
+    """
+    The annotations of a class, with the string ones (`from __future__ import annotations`) evaluated one by one
+    in the namespace of its module and class, like inspect.get_annotations(eval_str=True) does,
+    and the errors of those that can not be resolved (e.g. names imported under TYPE_CHECKING), by attribute name.
+    """
+    module = sys.modules.get(obj.__module__)
+    module_globals = vars(module) if module is not None else {}
+    resolved, errors = {}, {}
+    for name, annotation in inspect.get_annotations(obj).items():
+        if not isinstance(annotation, str):
+            resolved[name] = annotation
+            continue
+        try:
+            resolved[name] = eval(annotation, module_globals, dict(vars(obj)))
+        except (NameError, AttributeError) as e:
+            errors[name] = e
+    return resolved, errors
+
+
+def unresolved_annotation_error(obj: type, name: str, error: Exception) -> TypeError:
+    return TypeError(f"Cannot resolve the annotation of {obj.__name__}.{name}: {error}")
+
+
+def compile_schema(schema: type) -> type[BaseModel] | None:
+    """
+    Turn the annotation of a configuration class attribute into a pydantic model, or None if it is not a schema.
+    Both pydantic models and plain classes with type annotations (and optional defaults) are accepted.
+    """
+    if not isinstance(schema, type):
+        return None
+    if issubclass(schema, BaseModel):
+        return schema
+
+    annotations, errors = resolve_annotations(schema)
+    for name, error in errors.items():  # Every annotation of a schema is a field
+        raise unresolved_annotation_error(schema, name, error) from error
+    if not annotations:
+        return None
+    fields = {name: (annotation, getattr(schema, name, ...)) for name, annotation in annotations.items()}
+    return create_model(schema.__name__, __config__=ConfigDict(frozen=True), **fields)
+
+
+def validate_sections(
+    schemas: Mapping[str, type[BaseModel]], resolved: Mapping[str, Mapping[str, str]], global_section: Mapping
+) -> dict[str, dict[str, Any]]:
+    """
+    Validate the resolved (local - global) values of every section that has a schema.
+    Sections missing from the configuration are validated against the Globals section alone.
+
+    Returns:
+        The typed values of the schema fields, per section name.
+    """
+    typed = {}
+    section_names = {section_name.casefold(): section_name for section_name in resolved}
+    for attr_name, model in schemas.items():
+        section_name = section_names.get(attr_name, attr_name)
+        try:
+            instance = model.model_validate(dict(resolved.get(section_name, global_section)))
+        except ValidationError as e:
+            raise ConfigValidationError(f"Invalid [{section_name}] section: {e}") from e
+        typed[section_name] = {field: getattr(instance, field) for field in type(instance).model_fields}
+    return typed
+
+
+_EMPTY = MappingProxyType({})
+
+
+class ConfigSnapshot:
+    """
+    Description
+
+    An immutable, fully parsed view of the configuration sources.
+    A ConfigMeta class holds exactly one snapshot at a time and a reload replaces it with a single assignment,
+    so a reader always resolves a key against one complete version of the configuration.
+
+    The resolution order local configs - global configs is precomputed once, when the snapshot is created,
+    into one flat dictionary per section, so a lookup is a single dictionary access.
+
+    Attributes
+
+    sections (MappingProxyType):
+        Read-only mapping of section name to the merged key-value pairs of that section.
+
+    resolved (MappingProxyType):
+        Same as sections, with the keys of the Globals section merged under the local keys of every section
+        and the typed values of the schema fields (if any) on top.
+
+    typed (MappingProxyType):
+        The validated, typed values of the sections that have a schema.
+
+    origins (MappingProxyType):
+        The source each (section, key) value came from, useful to inspect the merged view.
+
+    version (int):
+        Incremented on every reload of the owning class.
+
+    cache (dict):
+        Values resolved by the get() method of the sections, keyed by (section, key, cast), at most GET_CACHE_SIZE.
+        It is bound to the snapshot, so a new snapshot always starts with an empty cache.
+
+    key (tuple | None):
+        Identifies the ConfigMeta class definition the snapshot belongs to (see install_snapshot).
+
+    sources (tuple):
+        The resolved sources (Paths and EnvSource) the snapshot was loaded from.
+
+    Snapshots are picklable. Only the merged sections and the metadata are pickled, the resolved view is rebuilt
+    on unpickling and the cache starts empty, so the payload handed to process-pool workers stays compact.
+    """
+
+    __slots__ = ("sections", "resolved", "typed", "origins", "version", "cache", "key", "sources")
+
+    def __init__(
+        self,
+        sections: dict[str, dict[str, str]],
+        version: int = 0,
+        origins: dict[tuple[str, str], str] | None = None,
+        key: tuple | None = None,
+        sources: Sequence[Path | EnvSource] = (),
+        schemas: Mapping[str, type[BaseModel]] | None = None,
+        typed: Mapping[str, Mapping[str, Any]] | None = None,
+    ):
+        """
+        schemas: Mapping[str, type[BaseModel]]
+            Models to validate the sections with, keyed by the class attribute name of the section.
+        typed: Mapping[str, Mapping[str, Any]]
+            Already validated values (e.g. of an unpickled snapshot), the schemas are ignored when given.
+        """
+        self.sections = MappingProxyType({name: MappingProxyType(dict(values)) for name, values in sections.items()})
+        global_section = self.sections.get("Globals", _EMPTY)
+        resolved = {name: {**global_section, **values} for name, values in self.sections.items()}
+        if typed is None:
+            typed = validate_sections(schemas, resolved, global_section) if schemas else {}
+        for name, values in typed.items():
+            resolved[name] = {**resolved.get(name, global_section), **values}
+        self.typed = MappingProxyType({name: MappingProxyType(dict(values)) for name, values in typed.items()})
+        self.resolved = MappingProxyType({name: MappingProxyType(values) for name, values in resolved.items()})
+        self.origins = MappingProxyType(dict(origins or {}))
+        self.version = version
+        self.cache = {}
+        self.key = key
+        self.sources = tuple(sources)
+
+    def __reduce__(self):
+        sections = {name: dict(values) for name, values in self.sections.items()}
+        typed = {name: dict(values) for name, values in self.typed.items()}
+        return self.__class__, (sections, self.version, dict(self.origins), self.key, self.sources, None, typed)
+
+    @classmethod
+    def from_sources(
+        cls,
+        sources: Sequence[Path | EnvSource],
+        version: int = 0,
+        key: tuple | None = None,
+        schemas: Mapping[str, type[BaseModel]] | None = None,
+    ) -> "ConfigSnapshot":
+        sections, origins = load_sources(sources)
+        return cls(sections, version, origins, key, sources, schemas)
+
+    def lookup(self, section_name: str, key: str) -> str | None:
+        """Resolve a key with resolution order local configs - global configs. Keys are case-insensitive."""
+        section = self.resolved.get(section_name)
+        if section is None:
+            section = self.sections.get("Globals", _EMPTY)
+        return section.get(key.lower())
+
+    def diff(self, other: "ConfigSnapshot") -> frozenset[tuple[str, str]]:
+        """Return the (section, key) pairs that were added, removed or changed between the two snapshots."""
+        changed = set()
+        for section_name in self.sections.keys() | other.sections.keys():
+            old = self.sections.get(section_name, _EMPTY)
+            new = other.sections.get(section_name, _EMPTY)
+            changed.update((section_name, key) for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+        return frozenset(changed)
+
+
+# Snapshots handed over by install_snapshot, keyed by the definition of the class they belong to
+_installed_snapshots: dict[tuple, ConfigSnapshot] = {}
+
+
+def snapshot_key(
+    name: str, config_filename: str | None, config_directory: str | None, config_sources: Sequence
+) -> tuple:
+    """Identify a ConfigMeta class definition by its name and arguments, which are the same in every process."""
+    return name, config_filename, str(config_directory), tuple(map(str, config_sources))
+
+
+def install_snapshot(*snapshots: ConfigSnapshot) -> None:
+    """
+    Make ConfigMeta build classes from the given snapshots instead of reading their configuration files.
+
+    Meant to be used as the initializer of a process pool, so that workers do not walk directories and re-parse
+    the configuration:
+
+        with ProcessPoolExecutor(initializer=install_snapshot, initargs=(Config.snapshot,)) as executor:
+            ...
+
+    The classes load their configuration lazily, so a class created before the initializer runs (spawn workers
+    import the main module, and the modules it imports, first) is still loaded from the installed snapshot.
+    A class that has already been loaded in the process is updated in place, as after a reload.
+    """
+    for snapshot in snapshots:
+        if snapshot.key is None:
+            raise ValueError("Only snapshots of a ConfigMeta class can be installed")
+        _installed_snapshots[snapshot.key] = snapshot
+        for config_cls in list(_config_classes):
+            if config_cls._key == snapshot.key and not isinstance(config_cls, UnloadedConfigMeta):
+                config_cls._snapshot = snapshot
+                config_cls._install_sections()
+
+
+# Every class created with ConfigMeta, so their locks and watchers can be reset in forked children
+_config_classes = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    # The watcher thread does not survive a fork and the lock could have been held by another thread
+    for config_cls in list(_config_classes):
+        config_cls._reload_lock = threading.Lock()
+        config_cls._load_lock = threading.Lock()
+        config_cls._watcher = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def make_getter(owner: type, section_name: str):
+    """
+    Define a get function that get with resolution order local configs - global configs -default value
+    So, each section which is a class will look for a key firstly in its attribute, if the key does
+    not exist in the section(class attributes) then it will look for the key in the Global section
+
+    The closure reads the current snapshot of the owner class on every call, so it never mixes values of two
+    versions of the file. Resolved values are cached per (key, cast) pair in the snapshot, so repeated calls
+    neither re-resolve the key nor re-run the cast. The cache holds at most GET_CACHE_SIZE values and is emptied
+    when it is full: each inline `cast=lambda ...` is a new function, and so a new key.
+    A value found that cannot be cast raises ValueError. A missing key returns the default, cast when it is not None
+    and returned as given when the cast fails (e.g. a sentinel object); defaults are not cached.
+
+    Args:
+        owner: The configuration class (created with ConfigMeta) that holds the current snapshot
+        section_name: The name of the section the get method belongs to
+
+    Returns:
+        Closure with access to local and global configurations.
+    """
+
+    def get(attr, default=None, cast=None):
+        snapshot = owner._snapshot
+        # Not try/except KeyError: the missing keys, never cached, would pay for an exception on every call
+        val = snapshot.cache.get((section_name, attr, cast), _MISSING)
+        if val is not _MISSING:
+            return val
+
+        val = snapshot.lookup(section_name, attr)
+        if val is None:
+            if cast and default is not None:
+                try:
+                    return cast(default)
+                except (TypeError, ValueError):
+                    return default
+            return default
+
+        if cast:
+            val = apply_cast(attr, val, cast)
+        cache = snapshot.cache
+        if len(cache) >= GET_CACHE_SIZE:
+            cache.clear()
+        cache[section_name, attr, cast] = val
+        return val
+
+    return get
+
+
+def make_typed_getter(get: Callable, cast: Callable[[Any], Any]) -> Callable:
+    """Bind a cast to the get closure of a section, e.g. get_int(attr, default) == get(attr, default, int)"""
+
+    def typed_get(attr, default=None):
+        return get(attr, default, cast)
+
+    return typed_get
+
+
+def build_sections(owner: type, snapshot: ConfigSnapshot) -> dict[str, type]:
+    """
+    Create a section class for every section of the snapshot, keyed by the class attribute name.
+    Sections with a schema expose the typed values as attributes and are frozen.
+    """
+    sections = {}
+    for section_name in [*snapshot.sections, *(name for name in snapshot.typed if name not in snapshot.sections)]:
+        section_attrs = snapshot.sections.get(section_name, _EMPTY)
+        typed_attrs = snapshot.typed.get(section_name)
+        if typed_attrs is not None:
+            section_attrs = {**section_attrs, **typed_attrs}
+        class_name = section_name.capitalize()
+        cls_attr_name = section_name.casefold()
+        get = make_getter(owner, section_name)
+
+        sections[cls_attr_name] = SectionType(
+            class_name,
+            (object,),
+            {
+                "get": get,
+                "get_int": make_typed_getter(get, int),
+                "get_float": make_typed_getter(get, float),
+                "get_bool": make_typed_getter(get, to_bool),
+                "get_list": make_typed_getter(get, to_list),
+            },
+            section_name=section_name,
+            section_attrs=section_attrs,
+            frozen=typed_attrs is not None,
+        )
+
+    return sections
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    """
+    Description
+
+    A daemon thread that reloads a ConfigMeta class whenever one of its configuration files changes.
+    Parsing happens on the watcher thread and the new snapshot is swapped in atomically, so readers never pay
+    the parsing cost. A file that fails to parse is logged and the previous snapshot stays in place.
+
+    inotify is used when the optional `inotify_simple` package is installed (Linux only), otherwise
+    the modification time and size of the files are polled every `poll_interval` seconds.
+    Editors and deploy tools should replace the file atomically (write a temporary file and rename it),
+    since a polling watcher could otherwise pick up a partially written file.
+
+    Attributes
+
+    config_cls (type): The class created with ConfigMeta to keep up to date.
+
+    poll_interval (float): Seconds between two polls, or the read timeout when inotify is used.
+    """
+
+    def __init__(self, config_cls: type, poll_interval: float = 1.0):
+        self.config_cls = config_cls
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{config_cls.__name__}Watcher", daemon=True)
+        self._inotify = None
+        self._last_signature = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return inotify_simple is not None
+
+    def start(self) -> "ConfigWatcher":
+        # Take the baseline before the thread starts, so a change made right after start() is not missed
+        paths = self.config_cls.config_paths
+        if self.uses_inotify:
+            self._inotify = inotify_simple.INotify()
+            # Watch the directories, since an atomic replace gives the file a new inode
+            for directory in {path.parent for path in paths}:
+                self._inotify.add_watch(directory, inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MOVED_TO)
+        else:
+            self._last_signature = tuple(map(file_signature, paths))
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        if self._inotify is not None:
+            self._watch_inotify()
+        else:
+            self._poll()
+
+    def _poll(self) -> None:
+        paths = self.config_cls.config_paths
+        while not self._stop_event.wait(self.poll_interval):
+            signature = tuple(map(file_signature, paths))
+            if None not in signature and signature != self._last_signature:
+                self._last_signature = signature
+                self._reload()
+
+    def _watch_inotify(self) -> None:
+        names = {path.name for path in self.config_cls.config_paths}
+        try:
+            while not self._stop_event.is_set():
+                events = self._inotify.read(timeout=int(self.poll_interval * 1000))
+                if any(event.name in names for event in events):
+                    self._reload()
+        finally:
+            self._inotify.close()
+
+    def _reload(self) -> None:
+        try:
+            self.config_cls.reload()
+        except Exception:
+            logger.exception("Failed to reload %s, keeping the previous configuration", self.config_cls.__name__)
+
 
 class ConfigMeta(type):
     """
@@ -54,76 +612,208 @@ class ConfigMeta(type):
     that load settings from an .ini or .json file. It loads configurations dynamically as it is not required to
     know the sections ahead of time.
 
+    Settings can also be layered from an ordered list of sources, e.g. a base .ini, an environment-specific .json
+    and environment variables (EnvSource). The sources are merged once, at load, into a ConfigSnapshot;
+    later sources take precedence over earlier ones.
+
     Attributes
 
-    config_path (Path): The full path to the configuration file.
+    config_path (Path): The full path to the (last) configuration file.
+
+    config_paths (tuple[Path, ...]): The full paths of all the configuration files, in order of precedence.
 
     Sections: Each section in the configuration file is dynamically assigned as a class attribute,
               with its keys mapped as attributes of a dynamically generated section class.
+
+    Loading: The configuration is loaded lazily, on the first access to a section, config_path(s), snapshot or
+             reload, not when the class is created: a process-pool worker importing the module of the class
+             before install_snapshot runs does not read the files. Until then, the class is an instance of
+             UnloadedConfigMeta, whose __getattr__ triggers the load; afterwards, of its ConfigMeta again, so that
+             attribute reads do not pay for a Python-level __getattr__ hook.
+
+    Schemas: A section can be given a schema by annotating its attribute name on the configuration class with a
+             pydantic model or a plain class with type annotations. The section is validated once, when the
+             configuration is loaded (and on every reload), and its attributes hold the typed values, so reads
+             need no casting. An invalid configuration raises ConfigValidationError. Annotations that can not be
+             resolved (e.g. names imported under TYPE_CHECKING) are ignored, unless they annotate a section:
+             TypeError.
     """
 
-    def __new__(mcls, name, bases, cls_attrs, config_filename: str, config_directory: str | None = None):
+    def __new__(
+        mcls,
+        name,
+        bases,
+        cls_attrs,
+        config_filename: str | None = None,
+        config_directory: str | None = None,
+        config_sources: Sequence[str | Path | EnvSource] = (),
+    ):
         """
         config_filename: str
             The name of the configuration file for the environment ('prod', 'dev')
         config_dir: str
             The directory where the configuration file is located
+        config_sources: Sequence[str | Path | EnvSource]
+            Additional sources layered on top of config_filename, lowest precedence first.
+            Filenames are searched like config_filename, Paths are used as they are.
         """
-        config_path = find_file(config_filename, config_directory)
-
-        cls_attrs["config_path"] = config_path
-        cls_attrs["__doc__"] = f"Configurations for the {config_path.stem} environment"
-        config = ConfigParser()
-        if config_path.suffix == ".json":
-            config_dict = json.load(open(config_path))
-            config.read_dict(config_dict)
-        else:
-            config.read(config_path)
-
-        global_section_attrs = config["Globals"] if "Globals" in config else {}
-        for section_name in config.sections():
-            class_name = section_name.capitalize()
-            cls_attr_name = section_name.casefold()
-            section_attrs = config[section_name]
-
-            # Needed so the get method of each Section has access to global_sections
-            def make_getter(section, global_section):
-                """
-                Define a get function that get with resolution order local configs - global configs -default value
-                So, each section which is a class will look for a key firstly in its attribute, if the key does
-                not exist in the section(class attributes) then it will look for the key in the Global section
-
-                Args:
-                    section: Local configurations(Configurations under the section)
-                    global_section: Global configurations(Found under the section Global)
-
-                Returns:
-                    Closure with access to local and global configurations.
-                """
-
-                # The get method of each section which is stored as class attribute has access
-                # both to global and local configurations
-                def get(attr, default=None, cast=None):
-                    val = section.get(attr, None)
-                    if val is None:
-                        val = global_section.get(attr, default)
-                    if cast and val is not None:
-                        try:
-                            return cast(val)
-                        except:
-                            return default
-                    return val
-
-                return get
-
-            Section = SectionType(
-                class_name,
-                (object,),
-                {"get": make_getter(section_attrs, global_section_attrs)},
-                section_name=section_name,
-                section_attrs=section_attrs,
+        sources = [config_filename] if config_filename else []
+        sources.extend(config_sources)
+        if not sources:
+            raise TypeError(f"{name} requires a config_filename or config_sources")
+
+        if all(isinstance(source, EnvSource) for source in sources):
+            raise TypeError(f"{name} requires at least one configuration file")
+
+        cls = super().__new__(mcls, name, bases, cls_attrs)
+        cls._key = snapshot_key(name, config_filename, config_directory, config_sources)
+        cls._source_names = tuple(sources)
+        cls._config_directory = config_directory
+        annotations, cls._unresolved_annotations = resolve_annotations(cls)
+        cls._schemas = {
+            attr_name: model
+            for attr_name, annotation in annotations.items()
+            if (model := compile_schema(annotation)) is not None
+        }
+        cls._load_lock = threading.Lock()
+        cls._reload_lock = threading.Lock()
+        cls._subscribers = []
+        cls._watcher = None
+        cls._section_names = ()
+        _config_classes.add(cls)
+        cls.__class__ = unloaded_metaclass(mcls)
+        return cls
+
+    def _load(cls) -> None:
+        """Find the sources and load the snapshot (or take the installed one), then install the sections"""
+        with cls._load_lock:
+            metaclass = type(cls)
+            if not issubclass(metaclass, UnloadedConfigMeta):  # Loaded by another thread meanwhile
+                return
+            snapshot = _installed_snapshots.get(cls._key)
+            if snapshot is not None:
+                # Handed over by install_snapshot (e.g. in a process-pool worker), skip the filesystem altogether
+                sources = list(snapshot.sources)
+            else:
+                sources = [
+                    source if isinstance(source, (Path, EnvSource)) else find_file(source, cls._config_directory)
+                    for source in cls._source_names
+                ]
+                snapshot = ConfigSnapshot.from_sources(sources, key=cls._key, schemas=cls._schemas)
+            config_paths = tuple(source for source in sources if isinstance(source, Path))
+
+            cls._sources = tuple(sources)
+            cls._snapshot = snapshot
+            try:
+                cls._install_sections()
+            except BaseException:
+                del cls._snapshot
+                raise
+            cls.config_path = config_paths[-1]
+            cls.config_paths = config_paths
+            cls.__doc__ = f"Configurations for the {cls.config_path.stem} environment"
+            cls.__class__ = metaclass.loaded
+
+    @property
+    def snapshot(cls) -> ConfigSnapshot:
+        """The current, immutable snapshot. Pin it to read several keys from the same version of the file."""
+        return cls._snapshot
+
+    def _install_sections(cls) -> None:
+        sections = build_sections(cls, cls._snapshot)
+        # An annotation that can not be resolved is only an error when it may be the schema of a section
+        for attr_name, error in cls._unresolved_annotations.items():
+            if attr_name.casefold() in sections:
+                raise unresolved_annotation_error(cls, attr_name, error) from error
+        for attr_name in set(cls._section_names) - sections.keys():
+            delattr(cls, attr_name)
+        for attr_name, section in sections.items():
+            setattr(cls, attr_name, section)
+        cls._section_names = tuple(sections)
+
+    def reload(cls) -> frozenset[tuple[str, str]]:
+        """
+        Re-read the configuration sources and swap in a new snapshot.
+
+        The sources are parsed and merged before anything is replaced. The swap itself is a single assignment,
+        so get() calls running concurrently see either the old or the new snapshot, never a mix of both.
+        The new snapshot comes with an empty cache. Section classes are rebuilt afterwards, so direct attribute access
+        (config.section.key) picks up new values and sections that no longer exist in the file are removed.
+        Subscribers are notified with the changed keys, only if something changed.
+
+        Returns:
+            The (section, key) pairs that were added, removed or changed.
+        """
+        with cls._reload_lock:
+            old_snapshot = cls._snapshot
+            new_snapshot = ConfigSnapshot.from_sources(
+                cls._sources, old_snapshot.version + 1, old_snapshot.key, cls._schemas
             )
+            cls._snapshot = new_snapshot
+            cls._install_sections()
+            changed = old_snapshot.diff(new_snapshot)
 
-            cls_attrs[cls_attr_name] = Section
+        if changed:
+            for callback in list(cls._subscribers):
+                try:
+                    callback(cls, changed)
+                except Exception:
+                    logger.exception("Config subscriber %r failed", callback)
+        return changed
 
-        return super().__new__(mcls, name, bases, cls_attrs)
+    def cache_clear(cls) -> None:
+        """Drop the values cached by the get() method of every section."""
+        cls._snapshot.cache.clear()
+
+    def subscribe(cls, callback: Callable[[type, frozenset[tuple[str, str]]], Any]) -> Callable:
+        """
+        Register a callback(config_cls, changed_keys) called after every reload that changed something.
+        Returns the callback, so it can be used as a decorator.
+        """
+        cls._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(cls, callback: Callable) -> None:
+        cls._subscribers.remove(callback)
+
+    def watch(cls, poll_interval: float = 1.0) -> ConfigWatcher:
+        """
+        Opt in to hot reloading: start a background watcher on config_paths (idempotent).
+
+        Args:
+            poll_interval: Seconds between two polls of the file when inotify is not available.
+
+        Returns:
+            The running ConfigWatcher.
+        """
+        if cls._watcher is None or not cls._watcher.is_alive():
+            cls._watcher = ConfigWatcher(cls, poll_interval).start()
+        return cls._watcher
+
+    def unwatch(cls) -> None:
+        if cls._watcher is not None:
+            cls._watcher.stop()
+            cls._watcher = None
+
+
+class UnloadedConfigMeta(ConfigMeta):
+    """The metaclass of a ConfigMeta class until its configuration is loaded, by the first attribute it lacks"""
+
+    loaded = ConfigMeta
+
+    def __getattr__(cls, name: str) -> Any:
+        # Dunder lookups (copy, pickle, typing and doc tools) must not load the configuration
+        if name.startswith("__"):
+            raise AttributeError(f"type object {cls.__name__!r} has no attribute {name!r}")
+        cls._load()
+        return getattr(cls, name)
+
+
+@cache
+def unloaded_metaclass(metaclass: type[ConfigMeta]) -> type[UnloadedConfigMeta]:
+    """The UnloadedConfigMeta of a ConfigMeta subclass, keeping its methods available before the load"""
+    if issubclass(metaclass, UnloadedConfigMeta):  # Subclassing a configuration class that is not loaded yet
+        metaclass = metaclass.loaded
+    if metaclass is ConfigMeta:
+        return UnloadedConfigMeta
+    return type(f"Unloaded{metaclass.__name__}", (UnloadedConfigMeta, metaclass), {"loaded": metaclass})
@@ -1,21 +1,572 @@
 # dispatch.py
+import asyncio
+import inspect
+import json
+import multiprocessing
+import os
+from abc import ABCMeta, get_cache_token
+from bisect import bisect_right
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial, update_wrapper
+from operator import itemgetter
+from time import perf_counter_ns
 from types import MappingProxyType, MethodType
-from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-__all__ = ["Dispatcher"]
+# The type keys are resolved with the private helpers of functools.singledispatch, so that they dispatch exactly
+# like it does: _compose_mro(cls, types) merges the ABCs among `types` into the MRO of cls, and
+# _find_impl(cls, registry) picks the function of the closest registered class. They are not part of the public API:
+# only resolve_type uses them, and test_functools_mro_helpers (tests/test_dispatcher.py) checks their signatures
+# and results against singledispatch, so that a Python release changing them fails there rather than here.
+try:
+    from functools import _compose_mro, _find_impl
+except ImportError as e:
+    raise ImportError(
+        "Dispatcher(by_type=True) needs functools._compose_mro and functools._find_impl, "
+        "the private helpers of functools.singledispatch, which this Python version does not have"
+    ) from e
+
+__all__ = ["ANY", "OTHER_KEYS", "Dispatcher", "KeyStats"]
 
 T = TypeVar("T")
 
+KeyExtractor = Callable[[Tuple[Any, ...], Dict[str, Any]], Any]
+
+Placement = Literal["inline", "thread", "process"]
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """
+    A process pool starting its workers with forkserver (spawn where it is not available), never with fork:
+    the thread pool of the dispatcher may already be running, and forking a multi-threaded process can deadlock
+    the child on a lock held by another thread.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context(method))
+
+
+EXECUTOR_FACTORIES = {"thread": ThreadPoolExecutor, "process": process_pool}
+
+# Maximum number of wildcard resolutions cached per dispatcher, the cache is emptied when it is full
+WILDCARD_CACHE_SIZE = 4096
+
+
+class Wildcard:
+    """The type of ANY, a component of a tuple key that matches any value at its position"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "ANY"
+
+    def __reduce__(self) -> str:
+        return "ANY"
+
+
+ANY = Wildcard()
+
+# Maximum number of keys with their own statistics per dispatcher, the calls of the other keys are recorded together
+STATS_MAX_KEYS = 1024
+
+
+class OtherKeys:
+    """The type of OTHER_KEYS, the key of the statistics of the keys dispatched once the stats table is full"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "OTHER_KEYS"
+
+    def __reduce__(self) -> str:
+        return "OTHER_KEYS"
+
+
+OTHER_KEYS = OtherKeys()
+
+# Marks the end of a key in the wildcard trie, where its function is stored
+_END = object()
+
+
+def compile_key_extractor(
+    key_idx: Optional[Union[int, Sequence[int]]],
+    key_generator: Optional[Callable],
+    key_names: Optional[Sequence[str]],
+) -> KeyExtractor:
+    """
+    Build a closure extract(args, kwargs) that does only the work needed by the given dispatching settings.
+    The settings are checked once here instead of on every call.
+
+    Args:
+        key_idx (int | Sequence[int]): The index (or indices) of the positional arguments used as key.
+        key_generator (Callable, optional): Applied to the selected arguments, the keyword arguments are passed
+            by name and the positional arguments in the order of key_idx.
+        key_names (Sequence[str], optional): The names of the keyword arguments used as key, takes precedence
+            over key_idx. Without a key_generator, the key is the tuple of their values, in this order.
+
+    Returns:
+        The specialized key extractor.
+    """
+    if key_names:
+        return keyword_key_extractor(tuple(key_names), key_generator)
+    return positional_key_extractor(key_idx, key_generator)
+
+
+def keyword_key_extractor(names: Tuple[str, ...], key_generator: Optional[Callable]) -> KeyExtractor:
+    def missing_keywords(kwargs):
+        return TypeError(
+            f"Missing required keyword arguments: {set(names) - kwargs.keys()}."
+            f" Arguments used for dispatching must be passed as keyword arguments."
+        )
+
+    if key_generator:
+
+        def extract(args, kwargs):
+            try:
+                kws = {name: kwargs[name] for name in names}
+            except KeyError:
+                raise missing_keywords(kwargs) from None
+            return key_generator(**kws)
+
+    elif len(names) == 1:
+        (name,) = names
+
+        def extract(args, kwargs):
+            try:
+                return (kwargs[name],)
+            except KeyError:
+                raise missing_keywords(kwargs) from None
+
+    else:
+        get_values = itemgetter(*names)
+
+        def extract(args, kwargs):
+            try:
+                return get_values(kwargs)
+            except KeyError:
+                raise missing_keywords(kwargs) from None
+
+    return extract
+
+
+def positional_key_extractor(key_idx: Union[int, Sequence[int]], key_generator: Optional[Callable]) -> KeyExtractor:
+    if not isinstance(key_idx, (tuple, list)):
+        idx = key_idx
+        if key_generator:
+            return lambda args, kwargs: key_generator(args[idx])
+        return lambda args, kwargs: args[idx]
+
+    indices = tuple(key_idx)
+    if len(indices) == 1:
+        (idx,) = indices
+        if key_generator:
+            return lambda args, kwargs: key_generator(args[idx])
+        return lambda args, kwargs: (args[idx],)
+
+    get_args = itemgetter(*indices)
+    if key_generator:
+        return lambda args, kwargs: key_generator(*get_args(args))
+    return lambda args, kwargs: get_args(args)
+
+
+class MemoizedKeyGenerator:
+    """
+    Wraps a key_generator with a bounded LRU cache keyed on the raw selected arguments.
+    The key_generator must be a pure function of these arguments. Unhashable arguments bypass the cache.
+    Values that are equal but of different types (1, 1.0, True) are cached separately.
+    """
+
+    def __init__(self, key_generator: Callable, maxsize: int):
+        self.key_generator = key_generator
+        self.maxsize = maxsize
+        self._cached = lru_cache(maxsize=maxsize, typed=True)(key_generator)
+        self.unhashable = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            hash(args)
+            if kwargs:
+                hash(tuple(kwargs.values()))
+        except TypeError:
+            self.unhashable += 1
+            return self.key_generator(*args, **kwargs)
+        return self._cached(*args, **kwargs)
+
+    def cache_info(self) -> Dict[str, int]:
+        info = self._cached.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "unhashable": self.unhashable,
+            "maxsize": info.maxsize,
+            "currsize": info.currsize,
+        }
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+        self.unhashable = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.key_generator!r}, maxsize={self.maxsize})"
+
+
+def is_type_key(key: Any) -> bool:
+    return isinstance(key, type) or (isinstance(key, tuple) and all(isinstance(item, type) for item in key))
+
+
+def resolve_type(key: Union[type, Tuple[type, ...]], registry: Dict[Any, Callable]) -> Optional[Callable]:
+    """
+    Find the handler registered for the closest base class(es) of a type key, None if there is no match.
+
+    A single type is resolved exactly like functools.singledispatch does, through its MRO including ABCs
+    (_find_impl and _compose_mro are the helpers singledispatch itself uses).
+    A tuple of types matches the registered tuples whose items are all base classes of the corresponding items.
+    Among those, the most specific is the one that is at least as close (in MRO order) as every other match
+    at every position. If no match is the most specific, the dispatch is ambiguous and RuntimeError is raised.
+    """
+    if not isinstance(key, tuple):
+        return _find_impl(key, {cls: func for cls, func in registry.items() if isinstance(cls, type)})
+
+    matches = [
+        (registered, func)
+        for registered, func in registry.items()
+        if isinstance(registered, tuple)
+        and len(registered) == len(key)
+        and all(issubclass(cls, base) for cls, base in zip(key, registered, strict=True))
+    ]
+    if not matches:
+        return None
+
+    # The rank of a base class is its position in the MRO (composed with the registered ABCs) of the argument type
+    ranks = []
+    for position, cls in enumerate(key):
+        mro = _compose_mro(cls, [registered[position] for registered, _ in matches])
+        ranks.append({base: rank for rank, base in enumerate(mro)})
+    scores = [
+        tuple(ranks[position].get(base, len(ranks[position])) for position, base in enumerate(registered))
+        for registered, _ in matches
+    ]
+    for (_, func), score in zip(matches, scores, strict=True):
+        if all(all(mine <= theirs for mine, theirs in zip(score, other, strict=True)) for other in scores):
+            return func
+
+    raise RuntimeError(f"Ambiguous dispatch for {key}: {[registered for registered, _ in matches]}")
+
+
+def unpack_items(
+    items: Iterable[Any], unpack: Optional[Literal["args", "kwargs"]]
+) -> List[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """Turn items into the (args, kwargs) of the calls: the item itself, its values or its key-value pairs"""
+    if unpack is None:
+        return [((item,), {}) for item in items]
+    if unpack == "args":
+        return [(tuple(item), {}) for item in items]
+    if unpack == "kwargs":
+        return [((), item) for item in items]
+    raise ValueError(f"unpack must be None, 'args' or 'kwargs', got {unpack!r}")
+
+
+def build_wildcard_trie(registry: Dict[Any, Callable]) -> Optional[Dict[Any, Any]]:
+    """
+    Index the tuple keys containing ANY in a trie with one level per position: each node maps a component
+    (a value or ANY) to the node of the next position, and the node after the last component holds the function.
+
+    Returns:
+        The root of the trie, or None when there is no wildcard key.
+    """
+    trie: Dict[Any, Any] = {}
+    for key, func in registry.items():
+        if is_wildcard_key(key):
+            add_wildcard_key(trie, key, func)
+    return trie or None
+
+
+def is_wildcard_key(key: Any) -> bool:
+    return isinstance(key, tuple) and any(component is ANY for component in key)
+
+
+def add_wildcard_key(trie: Dict[Any, Any], key: Tuple[Any, ...], func: Callable) -> None:
+    node = trie
+    for component in key:
+        node = node.setdefault(component, {})
+    node[_END] = func
+
+
+def match_wildcards(trie: Dict[Any, Any], key: Tuple[Any, ...]) -> Optional[Callable]:
+    """
+    Find the most specific wildcard key matching a tuple key. The cost depends on the length of the key
+    (at most two branches per position), not on the number of registered keys.
+
+    The most specific match has the most concrete (non-ANY) components. Between matches with as many concrete
+    components, the first position where they differ decides: the match with a concrete component there wins,
+    so ("eu", ANY) is more specific than (ANY, "x").
+    """
+    best, best_rank = None, None
+    stack = [(trie, ())]
+    while stack:
+        node, concrete = stack.pop()
+        depth = len(concrete)
+        if depth == len(key):
+            func = node.get(_END)
+            rank = (sum(concrete), concrete)
+            if func is not None and (best_rank is None or rank > best_rank):
+                best, best_rank = func, rank
+            continue
+        child = node.get(key[depth])
+        if child is not None:
+            stack.append((child, concrete + (True,)))
+        child = node.get(ANY)
+        if child is not None:
+            stack.append((child, concrete + (False,)))
+    return best
+
+
+def no_arguments_error() -> ValueError:
+    return ValueError("At least one positional or keyword argument is required for dispatching.")
+
+
+def compile_indexed_dispatch(idx: int, registry: Dict[Any, Callable], fallback: Callable) -> Callable[..., Any]:
+    """
+    The frozen dispatch on a single positional argument with exact keys: the key extraction is inlined.
+    """
+    get = registry.get
+
+    def dispatch(*args, **kwargs):
+        try:
+            key = args[idx]
+        except IndexError:
+            if not (args or kwargs):
+                raise no_arguments_error() from None
+            raise
+        return get(key, fallback)(*args, **kwargs)
+
+    return dispatch
+
+
+def compile_frozen_dispatch(
+    extract_key: KeyExtractor, registry: Dict[Any, Callable], resolve: Callable[[Any], Callable]
+) -> Callable[..., Any]:
+    """The frozen dispatch for any setting: extract the key, look up the registry, resolve the misses"""
+    get = registry.get
+
+    def dispatch(*args, **kwargs):
+        if not (args or kwargs):
+            raise no_arguments_error()
+        key = extract_key(args, kwargs)
+        function_to_call = get(key)
+        if function_to_call is None:
+            function_to_call = resolve(key)
+        return function_to_call(*args, **kwargs)
+
+    return dispatch
+
+
+def key_label(key: Any) -> str:
+    """A readable label for a key, used by the JSON export of the statistics"""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, type):
+        return key.__qualname__
+    if isinstance(key, tuple):
+        return f"({', '.join(map(key_label, key))})"
+    return repr(key)
+
+
+class KeyStats:
+    """
+    Statistics of the calls dispatched for one key.
+
+    The latency histogram has power-of-two buckets: histogram[b] counts the calls that took
+    less than 2**b nanoseconds (and at least 2**(b-1)).
+
+    Attributes:
+        calls (int): The number of calls dispatched for the key.
+        fallback_calls (int): How many of them went to the fallback function.
+        errors (int): How many of them raised.
+        total_ns (int): The total time spent in the functions, in nanoseconds.
+        histogram (Dict[int, int]): The number of calls per latency bucket.
+    """
+
+    __slots__ = ("calls", "fallback_calls", "errors", "total_ns", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.fallback_calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.histogram: Dict[int, int] = {}
+
+    def record(self, elapsed_ns: int, fallback: bool, failed: bool, calls: int = 1) -> None:
+        self.calls += calls
+        self.fallback_calls += calls if fallback else 0
+        self.errors += 1 if failed else 0
+        self.total_ns += elapsed_ns
+        bucket = (elapsed_ns // calls).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + calls
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "fallback_calls": self.fallback_calls,
+            "errors": self.errors,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.calls if self.calls else 0.0,
+            "histogram_ns": {1 << bucket: count for bucket, count in sorted(self.histogram.items())},
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(calls={self.calls}, fallback_calls={self.fallback_calls})"
+
+
+class BatchFunction:
+    """
+    Wraps a function registered with batch=True, which takes a list of items and returns a list of results.
+    Dispatcher.dispatch_many calls the wrapped function once per group of items. Called like a regular handler,
+    it runs the function on a batch of one item: the positional argument when it is the only argument,
+    the keyword arguments when there are only keyword arguments, the positional arguments otherwise.
+    Wrapping a coroutine function, it is one too (inspect.iscoroutinefunction), so dispatch_async awaits it.
+    """
+
+    def __init__(self, func: Callable[[List[Any]], Sequence[Any]]):
+        self.func = func
+        update_wrapper(self, func)
+        if inspect.iscoroutinefunction(func):
+            inspect.markcoroutinefunction(self)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if len(args) == 1 and not kwargs:
+            item = args[0]
+        elif not args:
+            item = kwargs
+        else:
+            item = args
+        results = self.func([item])
+        return first_result(results) if inspect.isawaitable(results) else results[0]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.func!r})"
+
+
+async def first_result(results: Awaitable[Sequence[Any]]) -> Any:
+    return (await results)[0]
+
+
+def run_coroutine(func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """Run a coroutine function to completion in a pool worker, with its own event loop"""
+    return asyncio.run(func(*args, **kwargs))
+
+
+def pool_task(func: Callable[..., Any]) -> Callable[..., Any]:
+    """The callable submitted to a pool for a function: a coroutine function is run by run_coroutine"""
+    return partial(run_coroutine, func) if inspect.iscoroutinefunction(func) else func
+
+
+class PooledFunction:
+    """
+    Wraps a function registered with executor="thread" or "process": calling it submits the call to the
+    executor of the dispatcher for this placement and returns a Future.
+    With a process pool, the function and the arguments must be picklable (e.g. a module-level function).
+    A coroutine function runs in the worker on an event loop of its own, the Future holds its result.
+    """
+
+    def __init__(self, func: Callable[..., Any], placement: Placement, get_executor: Callable[[Placement], Executor]):
+        # update_wrapper first, it copies the __dict__ of a wrapped BatchFunction, including its func
+        update_wrapper(self, func)
+        # A Future is returned, not a coroutine: drop the marker copied from a wrapped BatchFunction
+        vars(self).pop("_is_coroutine_marker", None)
+        self.func = func
+        self.placement = placement
+        self._get_executor = get_executor
+        self._task = pool_task(func)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Future:
+        return self._get_executor(self.placement).submit(self._task, *args, **kwargs)
+
+    def submit_chunks(
+        self, items: List[Any], calls: List[Tuple[Tuple[Any, ...], Dict[str, Any]]], chunksize: int
+    ) -> List[Future]:
+        """Submit the items in chunks, one task per chunk: a batch of items for a batch function, else the calls"""
+        executor = self._get_executor(self.placement)
+        if isinstance(self.func, BatchFunction):
+            task, work = pool_task(self.func.func), items
+        else:
+            task, work = partial(call_chunk, self._task), calls
+        return [executor.submit(task, work[start : start + chunksize]) for start in range(0, len(work), chunksize)]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.func!r}, placement={self.placement!r})"
+
+
+def call_chunk(func: Callable[..., Any], calls: List[Tuple[Tuple[Any, ...], Dict[str, Any]]]) -> List[Any]:
+    """Run the calls of a chunk in the worker, module-level to be picklable"""
+    return [func(*args, **kwargs) for args, kwargs in calls]
+
+
+def default_chunksize(count: int) -> int:
+    """About four chunks per core, so the workers stay busy while the chunks are unevenly long"""
+    return max(1, -(-count // (4 * (os.cpu_count() or 1))))
+
 
 class Dispatcher:
     """
     A class to manage function dispatching based on the selected argument.
     By default, it performs the dispatching based on the first argument.
 
+    With by_type=True, handlers are registered for classes (or tuples of classes when several arguments are used)
+    and resolved through the MRO of the argument types, including ABCs, like functools.singledispatch.
+    Resolutions are cached per type, so a repeated dispatch is a single dict lookup.
+
+    With several key_idx or key_names, components of the registered tuples can be ANY, matching any value.
+    The most specific match wins (see match_wildcards), and the resolutions are cached.
+
+    Used as a method, the dispatcher is bound like a function, with a new bound method per attribute lookup:
+    nothing is stored on the instance, which is freed by reference counting as usual.
+
+    Handlers registered with executor="thread" or "process" run in a thread or process pool owned by
+    the dispatcher: calling the dispatcher for their keys returns a Future, see register.
+
+    Once the registrations are done, freeze() locks the dispatcher and returns a faster specialized callable.
+
+    Handlers registered with register_range(lo, hi) handle the keys lo <= key < hi, unless the key has its
+    own handler. The ranges are kept sorted and searched by bisection, in O(log n).
+
+    With key_cache_size set, the results of the key_generator are memoized in a bounded LRU cache.
+
+    With stats=True, the calls, fallback hits, errors and latencies are recorded per key (see get_stats),
+    for the first STATS_MAX_KEYS distinct keys; the calls of the keys dispatched after are recorded together
+    under OTHER_KEYS, so that unbounded key spaces (fallback keys, ranges, types) do not grow the table.
+    When disabled, the only cost is a check of the stats table on each call.
+
     Attributes:
         fallback (Callable): The default function to call if no mapping matches.
 
-        registry (Dict[Any, Callable]): A dictionary mapping values to specific functiÎÎÎons.
+        registry (Mapping[Any, Callable]): A read-only view of the mapping of values to specific functions.
+            It changes through register and unregister, or by assigning a new dict, so that the type cache
+            and the wildcard index stay up to date.
     """
 
     def __init__(
@@ -24,6 +575,9 @@ class Dispatcher:
         key_idx: Optional[Union[int, List[int]]] = 0,
         key_generator: Optional[Callable] = None,
         key_names: Optional[Union[str, List[str], Set[str]]] = None,
+        by_type: bool = False,
+        stats: bool = False,
+        key_cache_size: Optional[int] = None,
     ):
         """
         Initialize the dispatcher with a default function.
@@ -37,21 +591,217 @@ class Dispatcher:
                 If named arguments are used instead of an index, the arguments used
                 for dispatching must be passed as keyword arguments.
                 By default, dispatching is performed using the first argument.
+            by_type (bool, optional): Dispatch on the type of the selected argument(s) through their MRO.
+                Without a key_generator, the key is the type of the argument, or the tuple of the types of the
+                arguments. A key_generator must return such a key itself.
+            stats (bool, optional): Record statistics of the dispatched calls per key, see get_stats.
+            key_cache_size (int, optional): Memoize the results of the key_generator for the last key_cache_size
+                distinct argument values (unbounded if 0), see key_cache_info. The key_generator must be pure.
+                Disabled by default.
         """
         self.fallback = fallback
-        self.registry: Dict[Any, Callable[..., Any]] = {}
-        self.key_idx = key_idx
-        self.key_generator = key_generator
-        self.key_names = key_names
+        self._registry: Dict[Any, Callable[..., Any]] = {}
+        # Sorted, non-overlapping [lo, hi) ranges, with their lower bounds apart for the bisection
+        self._ranges: List[Tuple[Any, Any, Callable[..., Any]]] = []
+        self._range_starts: List[Any] = []
+        self._frozen = False
+        self._executors: Dict[str, Executor] = {}
+        self._owned_executors: Set[str] = set()
+        self._coroutine_functions: Dict[Callable[..., Any], bool] = {}
+        self._by_type = by_type
+        self._key_idx = key_idx
+        self._key_generator = key_generator
+        self._key_names = None
+        self._key_names_order: Tuple[str, ...] = ()
+        self._key_cache_size = key_cache_size
+        self._memoized_key_generator: Optional[MemoizedKeyGenerator] = None
+        self._stats: Optional[Dict[Any, KeyStats]] = {} if stats else None
         self.__doc__ = fallback.__doc__
         self.__name__ = fallback.__name__
+        # Also compiles the key extractor
+        self.key_names = key_names
+
+    @property
+    def registry(self) -> MappingProxyType:
+        return MappingProxyType(self._registry)
+
+    @registry.setter
+    def registry(self, value: Mapping[Any, Callable[..., Any]]) -> None:
+        self._check_not_frozen()
+        # Copied, the indexes would go stale if the caller kept changing the mapping
+        self._registry = dict(value)
+        self._invalidate()
+
+    @property
+    def by_type(self) -> bool:
+        return self._by_type
+
+    @by_type.setter
+    def by_type(self, value: bool) -> None:
+        self._check_not_frozen()
+        self._by_type = value
+        self._compile()
+
+    @property
+    def key_idx(self) -> Optional[Union[int, List[int]]]:
+        return self._key_idx
+
+    @key_idx.setter
+    def key_idx(self, value: Optional[Union[int, List[int]]]) -> None:
+        self._check_not_frozen()
+        self._key_idx = value
+        self._compile()
 
-        # Coerce the key_names to set to facilitate some validation check when I extract the key
-        if self.key_names:
-            if isinstance(self.key_names, str):
-                self.key_names = {self.key_names}
-            elif isinstance(self.key_names, (tuple, list)):
-                self.key_names = set(key_names)
+    @property
+    def key_generator(self) -> Optional[Callable]:
+        return self._key_generator
+
+    @key_generator.setter
+    def key_generator(self, value: Optional[Callable]) -> None:
+        self._check_not_frozen()
+        self._key_generator = value
+        self._compile()
+
+    @property
+    def key_cache_size(self) -> Optional[int]:
+        return self._key_cache_size
+
+    @key_cache_size.setter
+    def key_cache_size(self, value: Optional[int]) -> None:
+        self._check_not_frozen()
+        self._key_cache_size = value
+        self._compile()
+
+    @property
+    def key_names(self) -> Optional[Set[str]]:
+        return self._key_names
+
+    @key_names.setter
+    def key_names(self, value: Optional[Union[str, List[str], Set[str]]]) -> None:
+        self._check_not_frozen()
+        # Coerce the key_names to set to facilitate some validation check when I extract the key.
+        # The order is kept aside, since it is the order of the values in the key (sets are sorted for determinism)
+        if not value:
+            self._key_names, self._key_names_order = None, ()
+        elif isinstance(value, str):
+            self._key_names, self._key_names_order = {value}, (value,)
+        elif isinstance(value, (tuple, list)):
+            self._key_names, self._key_names_order = set(value), tuple(dict.fromkeys(value))
+        else:
+            self._key_names, self._key_names_order = set(value), tuple(sorted(value))
+        self._compile()
+
+    @property
+    def stats(self) -> bool:
+        return self._stats is not None
+
+    @stats.setter
+    def stats(self, value: bool) -> None:
+        # Enabling keeps the statistics recorded so far, disabling drops them
+        if not value:
+            self._stats = None
+        elif self._stats is None:
+            self._stats = {}
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def _check_not_frozen(self) -> None:
+        if self._frozen:
+            raise RuntimeError(f"Dispatcher {self.__name__} is frozen, its registry and settings cannot change")
+
+    def _compile(self) -> None:
+        """Rebuild the specialized key extractor, called whenever a dispatching setting changes"""
+        key_generator = self._key_generator
+        if key_generator and self._key_cache_size is not None:
+            # maxsize=None is the unbounded cache of lru_cache
+            key_generator = MemoizedKeyGenerator(key_generator, self._key_cache_size or None)
+        self._memoized_key_generator = key_generator if isinstance(key_generator, MemoizedKeyGenerator) else None
+        extract_key = compile_key_extractor(self._key_idx, key_generator, self._key_names_order)
+        if self._by_type and not self._key_generator:
+            if self._key_names_order or isinstance(self._key_idx, (tuple, list)):
+                extract_value = extract_key
+
+                def extract_key(args, kwargs):
+                    return tuple(map(type, extract_value(args, kwargs)))
+
+            else:
+                extract_key = compile_key_extractor(self._key_idx, type, None)
+        self._extract_key = extract_key
+        self._invalidate()
+
+    def _invalidate(self, *added_keys: Any) -> None:
+        """
+        Drop the cached resolutions, called whenever the registry or a dispatching setting changes.
+        When keys were only registered, the indexes are updated for them instead of being rebuilt,
+        so that registering n keys stays O(n).
+        """
+        if added_keys:
+            self._invalidate_added(added_keys)
+            return
+
+        if self._by_type:
+            self._cache: Dict[Any, Callable[..., Any]] = {}
+            # Like singledispatch, watch for virtual subclasses (ABC.register) only when ABCs are registered
+            registered_types = (cls for key in self._registry for cls in (key if isinstance(key, tuple) else (key,)))
+            has_abcs = any(isinstance(cls, ABCMeta) for cls in registered_types)
+            self._abc_token = get_cache_token() if has_abcs else None
+        else:
+            # Exact keys first: the registry itself is the lookup table
+            self._cache = self._registry
+            self._abc_token = None
+        self._wildcards = None if self._by_type else build_wildcard_trie(self._registry)
+        self._wildcard_matches: Dict[Any, Callable[..., Any]] = {}
+
+    def _invalidate_added(self, added_keys: Tuple[Any, ...]) -> None:
+        if self._by_type:
+            self._cache = {}
+            added_types = (cls for key in added_keys for cls in (key if isinstance(key, tuple) else (key,)))
+            if self._abc_token is not None or any(isinstance(cls, ABCMeta) for cls in added_types):
+                self._abc_token = get_cache_token()
+            return
+
+        added_wildcards = [key for key in added_keys if is_wildcard_key(key)]
+        if added_wildcards:
+            if self._wildcards is None:
+                self._wildcards = {}
+            for key in added_wildcards:
+                add_wildcard_key(self._wildcards, key, self._registry[key])
+            self._wildcard_matches = {}
+
+    def _resolve(self, key: Any) -> Callable[..., Any]:
+        """Find the function for a key that is not in the lookup table, caching the result in type mode"""
+        if not self._by_type:
+            if self._wildcards is not None and isinstance(key, tuple):
+                return self._resolve_wildcards(key)
+            # Not cached, each value of a continuous range would get its own entry
+            return self._find_range(key) if self._ranges else self.fallback
+
+        function_to_call = resolve_type(key, self._registry) or self.fallback
+        self._cache[key] = function_to_call
+        return function_to_call
+
+    def _resolve_wildcards(self, key: Tuple[Any, ...]) -> Callable[..., Any]:
+        function_to_call = self._wildcard_matches.get(key)
+        if function_to_call is None:
+            function_to_call = match_wildcards(self._wildcards, key)
+            if function_to_call is None:
+                function_to_call = self._find_range(key) if self._ranges else self.fallback
+            if len(self._wildcard_matches) >= WILDCARD_CACHE_SIZE:
+                self._wildcard_matches.clear()
+            self._wildcard_matches[key] = function_to_call
+        return function_to_call
+
+    def _find_range(self, key: Any) -> Callable[..., Any]:
+        """Find the function of the range containing the key, or the default function"""
+        try:
+            index = bisect_right(self._range_starts, key) - 1
+            if index >= 0 and key < self._ranges[index][1]:
+                return self._ranges[index][2]
+        except TypeError:  # not comparable with the bounds, e.g. a string among numeric ranges
+            pass
+        return self.fallback
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         """
@@ -67,33 +817,423 @@ class Dispatcher:
         if not (args or kwargs):
             raise ValueError("At least one positional or keyword argument is required for dispatching.")
 
-        key = self.extract_key(args, kwargs)
-        function_to_call = self.registry.get(key, self.fallback)
+        key = self._extract_key(args, kwargs)
+        if self._abc_token is not None and self._abc_token != get_cache_token():
+            self._invalidate()
+        function_to_call = self._cache.get(key)
+        if function_to_call is None:
+            function_to_call = self._resolve(key)
+        if self._stats is not None:
+            return self._call_with_stats(key, function_to_call, function_to_call, args, kwargs)
         return function_to_call(*args, **kwargs)
 
+    def _call_with_stats(
+        self,
+        key: Any,
+        function_to_call: Callable[..., Any],
+        run: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        calls: int = 1,
+    ) -> Any:
+        """Run run(*args, **kwargs), which makes `calls` calls of the function, and record them for the key"""
+        failed = True
+        start = perf_counter_ns()
+        try:
+            result = run(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._record(key, function_to_call, perf_counter_ns() - start, failed, calls)
+
+    def _record(
+        self, key: Any, function_to_call: Callable[..., Any], elapsed_ns: int, failed: bool, calls: int = 1
+    ) -> None:
+        stats = self._stats
+        if stats is None:  # disabled while the call was running
+            return
+        key_stats = stats.get(key)
+        if key_stats is None:
+            if len(stats) >= STATS_MAX_KEYS:
+                key = OTHER_KEYS
+                key_stats = stats.get(key)
+            if key_stats is None:
+                key_stats = stats[key] = KeyStats()
+        key_stats.record(elapsed_ns, function_to_call is self.fallback, failed, calls)
+
+    def dispatch_many(
+        self,
+        items: Iterable[Any],
+        unpack: Optional[Literal["args", "kwargs"]] = None,
+        chunksize: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Dispatch many items at once. The keys are extracted in one pass and the items are grouped by key.
+        A function registered with batch=True is called once per key with the list of its items and must return
+        one result per item, in the same order. Any other function is called once per item.
+
+        Args:
+            items (Iterable): The items to dispatch.
+            unpack (str, optional): How an item is passed to the functions called per item. By default, it is
+                the only positional argument. "args" unpacks it as positional and "kwargs" as keyword arguments.
+            chunksize (int, optional): The number of items per task submitted to the pool of a function registered
+                with an executor. By default, about four tasks per core for each key.
+
+        Returns:
+            List[Any]: The results, in the order of the items.
+        """
+        items = list(items)
+        calls = unpack_items(items, unpack)
+
+        extract_key = self._extract_key
+        groups: Dict[Any, List[int]] = {}
+        for index, (args, kwargs) in enumerate(calls):
+            groups.setdefault(extract_key(args, kwargs), []).append(index)
+
+        results: List[Any] = [None] * len(items)
+        # The pooled groups are submitted first, so that they run while the inline groups are processed
+        pending = []
+        for key, indices in list(groups.items()):
+            function_to_call = self.get_function(key)
+            if isinstance(function_to_call, PooledFunction):
+                size = chunksize or default_chunksize(len(indices))
+                group_items = [items[index] for index in indices]
+                group_calls = [calls[index] for index in indices]
+                pending.append((indices, size, function_to_call.submit_chunks(group_items, group_calls, size)))
+                del groups[key]
+
+        for key, indices in groups.items():
+            function_to_call = self.get_function(key)
+            group = (function_to_call, indices, items, calls, results)
+            if self._stats is not None:
+                self._call_with_stats(key, function_to_call, self._run_group, group, {}, len(indices))
+            else:
+                self._run_group(*group)
+
+        for indices, size, futures in pending:
+            for start, future in zip(range(0, len(indices), size), futures, strict=True):
+                chunk = indices[start : start + size]
+                chunk_results = future.result()
+                if len(chunk_results) != len(chunk):
+                    raise ValueError(f"Batch function returned {len(chunk_results)} results for {len(chunk)} items")
+                for index, result in zip(chunk, chunk_results, strict=True):
+                    results[index] = result
+
+        return results
+
+    @staticmethod
+    def _run_group(
+        function_to_call: Callable[..., Any],
+        indices: List[int],
+        items: List[Any],
+        calls: List[Tuple[Tuple[Any, ...], Dict[str, Any]]],
+        results: List[Any],
+    ) -> None:
+        """Call the function for the items of a group, in one call for a batch function, and store the results"""
+        if isinstance(function_to_call, BatchFunction):
+            batch_results = function_to_call.func([items[index] for index in indices])
+            if len(batch_results) != len(indices):
+                raise ValueError(
+                    f"Batch function {function_to_call.__name__} returned {len(batch_results)} results"
+                    f" for {len(indices)} items"
+                )
+            for index, result in zip(indices, batch_results, strict=True):
+                results[index] = result
+        else:
+            for index in indices:
+                args, kwargs = calls[index]
+                results[index] = function_to_call(*args, **kwargs)
+
+    async def dispatch_async(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Awaitable dispatch. Coroutine functions are awaited, regular functions run in the default executor
+        of the event loop (a thread pool), so they never block it.
+
+        Args:
+            *args: Positional arguments to pass to the selected function.
+            **kwargs: Keyword arguments to pass to the selected function.
+
+        Returns:
+            The result of the dispatched function.
+        """
+        if not (args or kwargs):
+            raise ValueError("At least one positional or keyword argument is required for dispatching.")
+
+        key = self._extract_key(args, kwargs)
+        return await self._run_async(key, self.get_function(key), args, kwargs)
+
+    async def dispatch_many_async(
+        self,
+        items: Iterable[Any],
+        unpack: Optional[Literal["args", "kwargs"]] = None,
+        limit: int = 10,
+        executor: Optional[Executor] = None,
+    ) -> List[Any]:
+        """
+        Dispatch many items concurrently, with at most `limit` functions running at the same time.
+        The functions run as tasks of an asyncio.TaskGroup, bounded by a semaphore. Coroutine functions are
+        awaited and regular functions are offloaded to the executor, so both can be mixed.
+        If a function raises, the remaining tasks are cancelled and the errors are raised as an ExceptionGroup.
+
+        Args:
+            items (Iterable): The items to dispatch.
+            unpack (str, optional): How an item is passed to the functions, see dispatch_many.
+            limit (int, optional): The maximum number of functions running concurrently.
+            executor (Executor, optional): Where regular functions run, the default executor of the loop if None.
+
+        Returns:
+            List[Any]: The results, in the order of the items.
+        """
+        semaphore = asyncio.Semaphore(limit)
+        extract_key = self._extract_key
+
+        async def run(args, kwargs):
+            async with semaphore:
+                key = extract_key(args, kwargs)
+                return await self._run_async(key, self.get_function(key), args, kwargs, executor)
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run(args, kwargs)) for args, kwargs in unpack_items(items, unpack)]
+
+        return [task.result() for task in tasks]
+
+    async def _run_async(
+        self,
+        key: Any,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        executor: Optional[Executor] = None,
+    ) -> Any:
+        is_coroutine_function = self._coroutine_functions.get(func)
+        if is_coroutine_function is None:
+            is_coroutine_function = self._coroutine_functions[func] = inspect.iscoroutinefunction(func)
+
+        if is_coroutine_function:
+            awaitable = func(*args, **kwargs)
+        elif isinstance(func, PooledFunction):
+            awaitable = asyncio.wrap_future(func(*args, **kwargs))
+        else:
+            awaitable = asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+        if self._stats is None:
+            return await awaitable
+
+        failed = True
+        start = perf_counter_ns()
+        try:
+            result = await awaitable
+            failed = False
+            return result
+        finally:
+            self._record(key, func, perf_counter_ns() - start, failed)
+
     def __get__(self, instance, owner_class):
         if instance is None:
             return self
-
+        # Not cached: a bound method stored on the instance is copied with it, hides later changes to the class
+        # attribute and creates a reference cycle, and a cached wrapper holding the instance weakly adds
+        # a Python-level call, which costs more than allocating this bound method (see method_call in the benchmark)
         return MethodType(self, instance)
 
-    def register(self, key: Any) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def register(
+        self, key: Any, batch: bool = False, executor: Optional[Placement] = None
+    ) -> Callable[[Callable[..., T]], Callable[..., T]]:
         """
         Decorator factory to register a function to handle a specific key.
 
         Args:
             key (Any): The key to associate with the function.
+            batch (bool, optional): The function accepts a list of items and returns a list of results,
+                so dispatch_many calls it once per key instead of once per item. The registry holds it wrapped
+                in a BatchFunction, which keeps it callable with the arguments of a single call.
+            executor (str, optional): Where the function runs. "inline" (the default) calls it directly.
+                With "thread" or "process", the calls are submitted to the thread or process pool of the dispatcher
+                (see set_executor) and return a Future; dispatch_many submits the items in chunks and waits for them.
+                Functions running in a process pool and their arguments must be picklable.
 
         Returns:
             A decorator function that registers the provided function and return the same function as it is.
         """
+        self._check_not_frozen()
+        self._check_placement(executor)
+        if self._by_type and not is_type_key(key):
+            raise TypeError(f"Only classes (or tuples of classes) can be registered with by_type=True, got {key!r}")
 
         def decorator(func: Callable[..., T]) -> Callable[..., T]:
-            self.registry[key] = func
+            # Checked again: the dispatcher may have been frozen between register and the decoration
+            self._check_not_frozen()
+            self._registry[key] = self._wrap(func, batch, executor)
+            self._invalidate(key)
             return func
 
         return decorator
 
+    def unregister(self, key: Any) -> Callable[..., Any]:
+        """
+        Remove the function registered for a key, the calls of the key then go to the ranges or the fallback.
+
+        Args:
+            key (Any): The registered key.
+
+        Raises:
+            KeyError: If no function is registered for the key.
+
+        Returns:
+            Callable[..., Any]: The removed function, as stored in the registry.
+        """
+        self._check_not_frozen()
+        func = self._registry.pop(key)
+        self._invalidate()
+        return func
+
+    def register_range(
+        self, lo: Any, hi: Any, batch: bool = False, executor: Optional[Placement] = None
+    ) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """
+        Decorator factory to register a function to handle the keys in the half-open range [lo, hi).
+        Keys registered with register take priority over the ranges. Not available with by_type=True.
+
+        Args:
+            lo (Any): The lower bound, included.
+            hi (Any): The upper bound, excluded. It must be greater than lo and comparable with it.
+            batch (bool, optional): The function is a batch function, see register.
+            executor (str, optional): Where the function runs, see register.
+
+        Raises:
+            ValueError: If the range is empty or overlaps a registered range.
+
+        Returns:
+            A decorator function that registers the provided function and return the same function as it is.
+        """
+        self._check_not_frozen()
+        self._check_placement(executor)
+        if self._by_type:
+            raise TypeError("Ranges cannot be registered with by_type=True")
+        if not lo < hi:
+            raise ValueError(f"Empty range [{lo!r}, {hi!r}), the lower bound must be less than the upper bound")
+
+        self._find_range_slot(lo, hi)  # Fail early, at the call of register_range
+
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+            # Checked again: the dispatcher may have been frozen, or other ranges registered,
+            # between register_range and the decoration
+            self._check_not_frozen()
+            index = self._find_range_slot(lo, hi)
+            self._ranges.insert(index, (lo, hi, self._wrap(func, batch, executor)))
+            self._range_starts.insert(index, lo)
+            # Range hits are not cached, except through the wildcard resolutions
+            self._wildcard_matches = {}
+            return func
+
+        return decorator
+
+    def _find_range_slot(self, lo: Any, hi: Any) -> int:
+        """The index where the range [lo, hi) goes in the sorted ranges. Raises ValueError if it overlaps one."""
+        index = bisect_right(self._range_starts, lo)
+        for other_lo, other_hi, _ in self._ranges[max(index - 1, 0) : index + 1]:
+            if lo < other_hi and other_lo < hi:
+                raise ValueError(f"Range [{lo!r}, {hi!r}) overlaps the registered range [{other_lo!r}, {other_hi!r})")
+        return index
+
+    def get_ranges(self) -> Tuple[Tuple[Any, Any, Callable[..., Any]], ...]:
+        """
+        Get the registered ranges, sorted by lower bound.
+
+        Returns:
+            Tuple[Tuple[Any, Any, Callable], ...]: The (lo, hi, function) of each range.
+        """
+        return tuple(self._ranges)
+
+    @staticmethod
+    def _check_placement(executor: Optional[Placement]) -> None:
+        if executor not in (None, "inline", *EXECUTOR_FACTORIES):
+            raise ValueError(f"executor must be 'inline', 'thread' or 'process', got {executor!r}")
+
+    def _wrap(self, func: Callable[..., Any], batch: bool, executor: Optional[Placement]) -> Callable[..., Any]:
+        """The function as stored in the registry"""
+        if batch:
+            func = BatchFunction(func)
+        if executor in EXECUTOR_FACTORIES:
+            func = PooledFunction(func, executor, self.get_executor)
+        return func
+
+    def get_executor(self, placement: Placement) -> Executor:
+        """
+        Get the executor running the functions registered with this placement, created on first use
+        (a ThreadPoolExecutor or a ProcessPoolExecutor with the default number of workers, see process_pool).
+
+        Args:
+            placement (str): "thread" or "process".
+
+        Returns:
+            Executor: The executor of the placement.
+        """
+        executor = self._executors.get(placement)
+        if executor is None:
+            executor = self._executors[placement] = EXECUTOR_FACTORIES[placement]()
+            self._owned_executors.add(placement)
+        return executor
+
+    def set_executor(self, placement: Placement, executor: Executor) -> None:
+        """
+        Use an executor of your own for a placement, e.g. a process pool with a spawn context.
+        The dispatcher does not shut it down.
+
+        Args:
+            placement (str): "thread" or "process".
+            executor (Executor): The executor running the functions registered with this placement.
+        """
+        if placement not in EXECUTOR_FACTORIES:
+            raise ValueError(f"placement must be 'thread' or 'process', got {placement!r}")
+        self._executors[placement] = executor
+        self._owned_executors.discard(placement)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the executors created by the dispatcher. They are created again if needed.
+
+        Args:
+            wait (bool, optional): Wait for the pending calls to complete.
+        """
+        for placement in list(self._owned_executors):
+            self._executors.pop(placement).shutdown(wait=wait)
+        self._owned_executors.clear()
+
+    def freeze(self) -> Callable[..., Any]:
+        """
+        Lock the registrations and the dispatching settings, and compile the key extraction, the registry and
+        the fallback into one specialized function, faster than calling the dispatcher.
+        With a single key_idx and exact keys, the key extraction is inlined.
+        The dispatcher itself keeps working (dispatch_many, get_function, ...), and the decorators returned
+        by register and register_range before freezing refuse to register.
+
+        Returns:
+            Callable[..., Any]: The frozen dispatch function, with the name and docstring of the dispatcher,
+                and the dispatcher as its `dispatcher` attribute.
+        """
+        self._frozen = True
+        registry = dict(self._registry)
+        if self._stats is not None:
+            # The statistics (enabled before freezing) are recorded by the generic path
+            def dispatch(*args, **kwargs):
+                return self(*args, **kwargs)
+
+        elif self._by_type:
+            # The type resolutions are cached by the dispatcher, which also watches ABC registrations
+            dispatch = compile_frozen_dispatch(self._extract_key, {}, self.get_function)
+        elif self._wildcards is not None or self._ranges:
+            dispatch = compile_frozen_dispatch(self._extract_key, registry, self._resolve)
+        elif isinstance(self._key_idx, int) and not (self._key_generator or self._key_names_order):
+            dispatch = compile_indexed_dispatch(self._key_idx, registry, self.fallback)
+        else:
+            fallback = self.fallback
+            dispatch = compile_frozen_dispatch(self._extract_key, registry, lambda key: fallback)
+
+        dispatch.__name__ = dispatch.__qualname__ = self.__name__
+        dispatch.__doc__ = self.__doc__
+        dispatch.dispatcher = self
+        return dispatch
+
     def get_registry(self) -> MappingProxyType:
         """
         Get an immutable view of the current function registry.
@@ -101,11 +1241,57 @@ class Dispatcher:
         Returns:
             MappingProxyType: An immutable mapping of registered keys to functions.
         """
-        return MappingProxyType(self.registry)
+        return MappingProxyType(self._registry)
+
+    def get_stats(self) -> Dict[Any, Dict[str, Any]]:
+        """
+        Get a snapshot of the statistics recorded per key, empty when stats are disabled.
+        Latencies are in nanoseconds and include the time spent in the dispatched function;
+        in dispatch_many, the items of a group are timed together and share the time of the group.
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: For each dispatched key (OTHER_KEYS for the keys beyond STATS_MAX_KEYS),
+                its calls, fallback_calls, errors, total_ns, mean_ns and histogram_ns (the number of calls per
+                latency upper bound).
+        """
+        return {key: key_stats.to_dict() for key, key_stats in list((self._stats or {}).items())}
+
+    def stats_json(self, **dumps_kwargs: Any) -> str:
+        """
+        Export the statistics as JSON, with the keys turned into readable labels and sorted by total time.
+
+        Args:
+            **dumps_kwargs: Passed to json.dumps, e.g. indent.
+
+        Returns:
+            str: The JSON document.
+        """
+        stats = sorted(self.get_stats().items(), key=lambda item: item[1]["total_ns"], reverse=True)
+        return json.dumps(
+            {"dispatcher": self.__name__, "keys": {key_label(key): data for key, data in stats}}, **dumps_kwargs
+        )
+
+    def reset_stats(self) -> None:
+        """Drop the statistics recorded so far, if stats are enabled"""
+        if self._stats is not None:
+            self._stats = {}
+
+    def key_cache_info(self) -> Dict[str, Optional[int]]:
+        """
+        Get the counters of the key_generator cache, all zero when the cache is disabled.
+        The cache is emptied whenever a dispatching setting changes.
+
+        Returns:
+            Dict[str, Optional[int]]: The hits, misses, unhashable calls (not cached), maxsize and currsize.
+        """
+        if self._memoized_key_generator is None:
+            return {"hits": 0, "misses": 0, "unhashable": 0, "maxsize": self._key_cache_size, "currsize": 0}
+        return self._memoized_key_generator.cache_info()
 
     def get_function(self, key: Any) -> Callable[..., T]:
         """
         Retrieve the function mapped to a specific key, or the default function.
+        In type mode, the key is resolved through the MRO like a dispatched call.
 
         Args:
             key (Any): The key to look up.
@@ -113,29 +1299,20 @@ class Dispatcher:
         Returns:
             Callable[..., Any]: The function associated with the key, or the default function.
         """
-        return self.registry.get(key, self.fallback)
+        if self._abc_token is not None and self._abc_token != get_cache_token():
+            self._invalidate()
+        function_to_call = self._cache.get(key)
+        return function_to_call if function_to_call is not None else self._resolve(key)
 
     def extract_key(self, args, kwargs):
-        if self.key_names:
-            # Check if there is a key that is not in the kwargs
-            missing_keys = self.key_names - kwargs.keys()
-            if missing_keys:
-                raise TypeError(
-                    f"Missing required keyword arguments: {missing_keys}."
-                    f" Arguments used for dispatching must be passed as keyword arguments."
-                )
-            # Create the dictionary with key-values to be passed to the key generator function
-            kws = {key: kwargs[key] for key in self.key_names}
-
-            if self.key_generator:
-                return self.key_generator(**kws)
-            else:
-                return tuple(kws.values())
-        else:
-            if self.key_generator:
-                return self.key_generator(args[self.key_idx])
+        """
+        Extract the dispatching key from the arguments of a call.
 
-            if isinstance(self.key_idx, (tuple, list)):
-                return tuple((args[i] for i in self.key_idx))
+        Args:
+            args (tuple): The positional arguments of the call.
+            kwargs (dict): The keyword arguments of the call.
 
-            return args[self.key_idx]
+        Returns:
+            The key used to look up the registry.
+        """
+        return self._extract_key(args, kwargs)
@@ -1,5 +1,85 @@
+import sys
+import threading
+import time
 import weakref
-from typing import Any, Generator
+from array import array
+from itertools import compress
+from typing import Any, Callable, Generator, Iterable
+
+try:
+    import numpy
+except ImportError:  # Optional, the bulk operations of ColumnRegistry fall back to pure Python
+    numpy = None
+
+# The registries listed by largest_registries(), with their names. Opt-in: track() or track_new_registries(True)
+_tracked: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_track_new = False
+
+
+def track(registry, name: str | None = None):
+    """Add a registry to the global list of registries, under a name for diagnostics. Returns the registry."""
+    _tracked[registry] = name or f"{registry.__class__.__name__}@{id(registry):#x}"
+    return registry
+
+
+def untrack(registry) -> None:
+    _tracked.pop(registry, None)
+
+
+def track_new_registries(enabled: bool = True) -> None:
+    """Track every registry created from now on, e.g. when a service starts with diagnostics enabled"""
+    global _track_new
+    _track_new = enabled
+
+
+def largest_registries(count: int = 10) -> list[dict[str, Any]]:
+    """
+    The tracked registries with the most entries, largest first. Only their sizes are read, never
+    their contents, so that a diagnostics endpoint can call it on a busy service.
+    """
+    sizes = [
+        {"name": name, "type": registry.__class__.__name__, "entries": len(registry)}
+        for registry, name in list(_tracked.items())
+    ]
+    return sorted(sizes, key=lambda size: size["entries"], reverse=True)[:count]
+
+
+def start_population(registry) -> None:
+    """The first sample of the growth rate, and the tracking of the new registry if enabled"""
+    registry._last_sample = (time.monotonic(), 0)
+    if _track_new:
+        track(registry)
+
+
+def entry_stats(entries: Iterable[list]) -> tuple[int, int, int]:
+    """The live and dead entries among `[ref, value]` entries, and their approximate size in bytes"""
+    live = dead = nbytes = 0
+    sizeof = sys.getsizeof
+    for entry in entries:
+        if entry[0]() is None:
+            dead += 1
+        else:
+            live += 1
+        nbytes += sizeof(entry) + sizeof(entry[0]) + sizeof(entry[1])
+    return live, dead, nbytes
+
+
+def population_stats(registry, live: int, dead: int, approx_bytes: int) -> dict[str, Any]:
+    """
+    The stats of a registry. The growth rate is the change in the number of entries per second since
+    the previous call (or since the registry was created).
+    """
+    now, entries = time.monotonic(), live + dead
+    then, previous = registry._last_sample
+    registry._last_sample = (now, entries)
+    return {
+        "type": registry.__class__.__name__,
+        "name": _tracked.get(registry),
+        "live": live,
+        "dead": dead,
+        "approx_bytes": approx_bytes,
+        "growth_per_second": (entries - previous) / (now - then) if now > then else 0.0,
+    }
 
 
 class DescriptorRegistry:
@@ -35,6 +115,16 @@ class DescriptorRegistry:
     along with the value in an internal dictionary. When the instance is garbage collected,
     the weak reference callback automatically cleans up the associated data.
 
+    Lookups check that the referent of the stored weak reference is the instance itself, so that
+    a new instance reusing the id of a dead one, before the callback of the dead one ran,
+    never reads its value: callers need no defensive checks.
+
+    The entries are `[ref, value]` lists: setting the value of a registered instance only replaces
+    the value in place, without allocating a new weak reference or entry. All the weak references
+    share one callback, created with the registry; they are `weakref.KeyedRef`s carrying the id
+    to remove (like in `weakref.WeakValueDictionary`), and the callback only holds a weak reference
+    to the registry, so it does not keep the registry alive.
+
     This design provides:
     - Safe, indirect per-instance storage.
     - Compatibility with all classes that support weak references, including slotted classes
@@ -45,9 +135,18 @@ class DescriptorRegistry:
     ---------
     - `__setitem__`, `__getitem__`: Standard item access storing the value for an instance.
     - `get`, `keys`, `values`, `items`, `valuerefs`: Utilities to introspect or retrieve the
-      current state of the registry.
+      current state of the registry. The iterators are lazy and skip the entries whose instance died
+      (a referent can die before its callback runs, e.g. during a garbage collection).
+    - `get_many`, `set_many`: Read or write the values of many instances in one call.
+    - `compact`: Purge the dead entries in one pass.
     - `__contains__`: Checks if a given instance is currently in the registry.
-    - `__repr__`: String representation useful for debugging.
+    - `__len__`: The number of entries, including the ones whose instance died before its callback ran.
+    - `stats`: Live and dead entries, approximate bytes held (values, weak references and entries,
+      measured shallowly with `sys.getsizeof`) and growth rate, for memory investigations.
+    - `__repr__`: The class and the number of entries, never the contents, which may be huge.
+
+    Registries can be tracked globally (`track`, or `track_new_registries` for all the new ones), so that
+    `largest_registries` lists the biggest ones from their sizes alone.
 
     Limitations
     -----------
@@ -58,39 +157,511 @@ class DescriptorRegistry:
 
     def __init__(self):
         self._data = {}
+        # While iterators are running, the callbacks defer the removals, like in weakref.WeakKeyDictionary
+        self._iterating = 0
+        self._pending_removals: list[weakref.KeyedRef] = []
+
+        selfref = weakref.ref(self)
+
+        def remove(ref):
+            registry = selfref()
+            if registry is not None:
+                if registry._iterating:
+                    registry._pending_removals.append(ref)
+                else:
+                    registry._discard(ref)
+
+        self._remove = remove
+        start_population(self)
+
+    def _discard(self, ref: weakref.KeyedRef) -> None:
+        entry = self._data.get(ref.key)
+        # The id may already belong to a new entry, if the instance was replaced before the callback ran
+        if entry is not None and entry[0] is ref:
+            del self._data[ref.key]
 
     def __setitem__(self, key, value):
         obj_id = id(key)
+        entry = self._data.get(obj_id)
+        if entry is not None and entry[0]() is key:
+            entry[1] = value
+        else:
+            # A stale entry, left by a dead instance with the same id, is replaced
+            self._data[obj_id] = [weakref.KeyedRef(key, self._remove, obj_id), value]
+
+    def __getitem__(self, key: object) -> Any:
+        entry = self._data.get(id(key))
+        if entry is None or entry[0]() is not key:
+            raise KeyError(f"{key} not found in storage")
+        return entry[1]
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(id(key))
+        return entry is not None and entry[0]() is key
 
-        def remove(_):
-            self._data.pop(obj_id, None)
+    def __len__(self) -> int:
+        return len(self._data) - len(self._pending_removals)
 
-        self._data[obj_id] = (weakref.ref(key, remove), value)
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(entries={len(self)})"
+
+    def stats(self) -> dict[str, Any]:
+        """Live and dead entries, approximate bytes held and growth rate, see the class docstring"""
+        live, dead, nbytes = entry_stats(list(self._data.values()))
+        return population_stats(self, live, dead, sys.getsizeof(self._data) + nbytes)
+
+    def get(self, key: object, default: Any = None) -> Any:
+        entry = self._data.get(id(key))
+        return entry[1] if entry is not None and entry[0]() is key else default
+
+    def get_many(self, keys: Iterable[object], default: Any = None) -> list[Any]:
+        """The values of the instances, in the same order, with the default for the missing ones"""
+        keys = list(keys)
+        entries = map(self._data.get, map(id, keys))
+        return [
+            entry[1] if entry is not None and entry[0]() is key else default
+            for key, entry in zip(keys, entries, strict=True)
+        ]
+
+    def set_many(self, items: Iterable[tuple[object, Any]]) -> None:
+        """Set the values of many instances from (instance, value) pairs, e.g. zip(instances, values)"""
+        data, remove = self._data, self._remove
+        for key, value in items:
+            obj_id = id(key)
+            entry = data.get(obj_id)
+            if entry is not None and entry[0]() is key:
+                entry[1] = value
+            else:
+                data[obj_id] = [weakref.KeyedRef(key, remove, obj_id), value]
+
+    def compact(self) -> int:
+        """
+        Purge the entries whose instance died, in one pass. Returns the number of entries removed.
+        The callbacks remove the entries on their own, this is for the ones they could not remove yet.
+        """
+        if self._iterating:
+            raise RuntimeError(f"Cannot compact {self.__class__.__name__} while it is being iterated")
+        self._pending_removals.clear()
+        dead = [obj_id for obj_id, (ref, _) in self._data.items() if ref() is None]
+        for obj_id in dead:
+            del self._data[obj_id]
+        return len(dead)
+
+    def _live_entries(self) -> Generator[tuple[weakref.KeyedRef, object, Any], None, None]:
+        """Lazily yield the (weak reference, instance, value) of the live entries"""
+        self._iterating += 1
+        try:
+            for ref, value in self._data.values():
+                obj = ref()
+                if obj is not None:
+                    yield ref, obj, value
+        finally:
+            self._iterating -= 1
+            if not self._iterating:
+                while self._pending_removals:
+                    self._discard(self._pending_removals.pop())
+
+    def items(self) -> Generator[tuple[object, Any], None, None]:
+        return ((obj, value) for _, obj, value in self._live_entries())
+
+    def values(self) -> Generator[Any, None, None]:
+        return (value for _, _, value in self._live_entries())
+
+    def keys(self) -> Generator[object, None, None]:
+        return (obj for _, obj, _ in self._live_entries())
+
+    def valuerefs(self) -> Generator[weakref.ReferenceType]:
+        return (ref for ref, _, _ in self._live_entries())
+
+
+class ThreadSafeDescriptorRegistry(DescriptorRegistry):
+    """
+    A DescriptorRegistry safe to share between threads, including on the free-threaded build of Python.
+
+    Motivation
+    ----------
+    The weak reference callbacks of a DescriptorRegistry remove entries from whichever thread runs the
+    garbage collection, while other threads set values or iterate: without the GIL, this is a data race,
+    and even with it, an iteration can fail with "dictionary changed size during iteration".
+
+    Design
+    ------
+    - Lock striping: the entries are split into `stripes` shards by object id, each with its own lock,
+      so that threads writing values of different instances rarely wait for each other.
+    - The weak reference callbacks take no lock, they queue the dead references, like the pending removals
+      of weakref.WeakKeyDictionary: a callback runs on whichever thread drops the last reference, which may
+      hold the lock of another shard (when a replaced value or a removed entry held the last reference to
+      another registered instance), and locking there could deadlock two writers. The writers and the
+      iterations purge the queue after releasing their locks, locking one shard at a time.
+    - Reads (`__getitem__`, `get`, `__contains__`) are a single dict lookup and take no lock.
+    - Iteration is snapshot-consistent: `items`, `keys`, `values` and `valuerefs` lock all the shards
+      (always in the same order), copy the live entries and release the locks before yielding,
+      so that the callbacks and the writers are never blocked by a slow consumer.
+    """
+
+    def __init__(self, stripes: int = 16):
+        if stripes < 1 or stripes & (stripes - 1):
+            raise ValueError(f"stripes must be a power of two, got {stripes}")
+        self._mask = stripes - 1
+        self._shards: list[dict] = [{} for _ in range(stripes)]
+        self._locks = [threading.RLock() for _ in range(stripes)]
+        self._pending_removals: list[weakref.KeyedRef] = []
+
+        selfref = weakref.ref(self)
+
+        def remove(ref):
+            registry = selfref()
+            if registry is not None:
+                registry._pending_removals.append(ref)  # Atomic, no lock
+
+        self._remove = remove
+        start_population(self)
+
+    def _stripe(self, obj_id: int) -> int:
+        # Objects are 16-byte aligned, the low bits of their ids are always the same
+        return (obj_id >> 4) & self._mask
+
+    def _purge(self) -> None:
+        """Remove the entries of the queued dead references. Must be called without holding any lock."""
+        pending = self._pending_removals
+        while pending:
+            try:
+                ref = pending.pop()
+            except IndexError:  # Emptied by another thread
+                return
+            stripe = self._stripe(ref.key)
+            with self._locks[stripe]:
+                shard = self._shards[stripe]
+                entry = shard.get(ref.key)
+                # The id may already belong to a new entry, if the instance was replaced before the purge
+                if entry is not None and entry[0] is ref:
+                    del shard[ref.key]
+
+    def __setitem__(self, key, value):
+        obj_id = id(key)
+        stripe = self._stripe(obj_id)
+        with self._locks[stripe]:
+            shard = self._shards[stripe]
+            entry = shard.get(obj_id)
+            if entry is not None and entry[0]() is key:
+                entry[1] = value
+            else:
+                shard[obj_id] = [weakref.KeyedRef(key, self._remove, obj_id), value]
+        if self._pending_removals:
+            self._purge()
+
+    def __getitem__(self, key: object) -> Any:
+        obj_id = id(key)
+        entry = self._shards[self._stripe(obj_id)].get(obj_id)
+        if entry is None or entry[0]() is not key:
+            raise KeyError(f"{key} not found in storage")
+        return entry[1]
+
+    def __contains__(self, key: object) -> bool:
+        obj_id = id(key)
+        entry = self._shards[self._stripe(obj_id)].get(obj_id)
+        return entry is not None and entry[0]() is key
+
+    def __len__(self) -> int:
+        return sum(map(len, self._shards)) - len(self._pending_removals)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(stripes={len(self._shards)}, entries={len(self)})"
+
+    def stats(self) -> dict[str, Any]:
+        self._purge()
+        entries, nbytes = [], sys.getsizeof(self._shards)
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                entries.extend(shard.values())
+            nbytes += sys.getsizeof(shard)
+        live, dead, entry_bytes = entry_stats(entries)
+        return population_stats(self, live, dead, nbytes + entry_bytes)
+
+    def get(self, key: object, default: Any = None) -> Any:
+        obj_id = id(key)
+        entry = self._shards[self._stripe(obj_id)].get(obj_id)
+        return entry[1] if entry is not None and entry[0]() is key else default
+
+    def get_many(self, keys: Iterable[object], default: Any = None) -> list[Any]:
+        shards, mask = self._shards, self._mask
+        values = []
+        for key in keys:
+            obj_id = id(key)
+            entry = shards[(obj_id >> 4) & mask].get(obj_id)
+            values.append(entry[1] if entry is not None and entry[0]() is key else default)
+        return values
+
+    def set_many(self, items: Iterable[tuple[object, Any]]) -> None:
+        """Set the values of many instances, locking each shard once"""
+        by_stripe: dict[int, list[tuple[int, object, Any]]] = {}
+        for key, value in items:
+            obj_id = id(key)
+            by_stripe.setdefault(self._stripe(obj_id), []).append((obj_id, key, value))
+        for stripe, rows in by_stripe.items():
+            with self._locks[stripe]:
+                shard = self._shards[stripe]
+                for obj_id, key, value in rows:
+                    entry = shard.get(obj_id)
+                    if entry is not None and entry[0]() is key:
+                        entry[1] = value
+                    else:
+                        shard[obj_id] = [weakref.KeyedRef(key, self._remove, obj_id), value]
+        self._purge()
+
+    def compact(self) -> int:
+        removed = 0
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                dead = [obj_id for obj_id, (ref, _) in shard.items() if ref() is None]
+                for obj_id in dead:
+                    del shard[obj_id]
+                removed += len(dead)
+        self._purge()
+        return removed
+
+    def snapshot(self) -> list[tuple[weakref.KeyedRef, object, Any]]:
+        """The (weak reference, instance, value) of the live entries, all read at the same time"""
+        self._purge()
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            entries = [entry for shard in self._shards for entry in shard.values()]
+            rows = [(ref, ref(), value) for ref, value in entries]
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+        return [row for row in rows if row[1] is not None]
+
+    def items(self) -> Generator[tuple[object, Any], None, None]:
+        return ((obj, value) for _, obj, value in self.snapshot())
+
+    def values(self) -> Generator[Any, None, None]:
+        return (value for _, _, value in self.snapshot())
+
+    def keys(self) -> Generator[object, None, None]:
+        return (obj for _, obj, _ in self.snapshot())
+
+    def valuerefs(self) -> Generator[weakref.ReferenceType]:
+        return (ref for ref, _, _ in self.snapshot())
+
+
+class ColumnRegistry:
+    """
+    A DescriptorRegistry for numeric fields, storing the values in a column: a growable `array.array`.
+
+    Motivation
+    ----------
+    With hundreds of thousands of instances, each value of a DescriptorRegistry is a Python object in its own
+    entry, so reading "all prices" walks all of them. Here each instance gets a slot, the index of its value
+    in the column, and the values are stored unboxed (8 bytes for the default typecode "d").
+    The memory saving is modest: about 218 bytes per instance against 268 for a DescriptorRegistry of floats
+    (benchmarks/bench_descriptor_registry.py, 200,000 instances), 19% less. Only the boxed float and the
+    `[ref, value]` entry go away; the id -> slot dict entry with its ints (about 110 bytes) and the weak
+    reference (88 bytes) remain, as the identity lookups and the cleanup on collection need them.
+    The gain is mostly in the bulk operations.
+
+    Design
+    ------
+    - `id(instance)` maps to the slot, and the weak reference of the slot (a `weakref.KeyedRef` carrying
+      the id) frees it when the instance is garbage collected. Freed slots are reused by new instances.
+    - Free slots hold 0 and are marked in a liveness mask (a `bytearray`), so the bulk operations
+      `sum`, `sort` and `to_array` run over the whole column at C speed, with NumPy when it is
+      installed (through a zero-copy view of the column) and `itertools.compress` otherwise.
+      `filter` calls its predicate per value everywhere, `mask` once with a NumPy array (NumPy only):
+      user code never receives a view of the column, which could not grow while the view exists.
+
+    Interface
+    ---------
+    The same as DescriptorRegistry, plus the bulk operations. Values that do not fit the typecode
+    raise `TypeError` or `OverflowError`, like `array.array`.
+    """
+
+    def __init__(self, typecode: str = "d"):
+        self.typecode = typecode
+        self._values = array(typecode)
+        self._live = bytearray()
+        self._refs: list[weakref.KeyedRef | None] = []
+        self._index: dict[int, int] = {}
+        self._free: list[int] = []
+
+        selfref = weakref.ref(self)
+
+        def remove(ref):
+            registry = selfref()
+            if registry is not None:
+                slot = registry._index.get(ref.key)
+                if slot is not None and registry._refs[slot] is ref:
+                    registry._release(ref.key, slot)
+
+        self._remove = remove
+        start_population(self)
+
+    def _release(self, obj_id: int, slot: int) -> None:
+        del self._index[obj_id]
+        self._refs[slot] = None
+        self._values[slot] = 0
+        self._live[slot] = 0
+        self._free.append(slot)
+
+    def __setitem__(self, key, value):
+        obj_id = id(key)
+        slot = self._index.get(obj_id)
+        if slot is not None:
+            if self._refs[slot]() is key:
+                self._values[slot] = value
+                return
+            # A stale slot, left by a dead instance with the same id
+            self._release(obj_id, slot)
+
+        if self._free:
+            slot = self._free[-1]
+            self._values[slot] = value  # first, so that a value of the wrong type leaves no trace
+            self._free.pop()
+            self._refs[slot] = weakref.KeyedRef(key, self._remove, obj_id)
+            self._live[slot] = 1
+        else:
+            slot = len(self._values)
+            self._values.append(value)
+            self._refs.append(weakref.KeyedRef(key, self._remove, obj_id))
+            self._live.append(1)
+        self._index[obj_id] = slot
 
     def __getitem__(self, key: object) -> Any:
-        weakref_value_tuple = self._data.get(id(key))
-        if weakref_value_tuple is None:
+        slot = self._index.get(id(key))
+        if slot is None or self._refs[slot]() is not key:
             raise KeyError(f"{key} not found in storage")
-        return weakref_value_tuple[1]
+        return self._values[slot]
 
     def __contains__(self, key: object) -> bool:
-        return id(key) in self._data
+        slot = self._index.get(id(key))
+        return slot is not None and self._refs[slot]() is key
+
+    def __len__(self) -> int:
+        return len(self._index)
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}({self._data})"
+        return f"{self.__class__.__name__}(typecode={self.typecode!r}, live={len(self._index)})"
+
+    def stats(self) -> dict[str, Any]:
+        """Like DescriptorRegistry.stats: the values are counted in the size of the column, unboxed"""
+        refs = [ref for ref in self._refs if ref is not None]
+        live = sum(1 for ref in refs if ref() is not None)
+        sizeof = sys.getsizeof
+        nbytes = sum(map(sizeof, (self._values, self._live, self._refs, self._index, self._free)))
+        nbytes += sum(map(sizeof, refs))
+        return population_stats(self, live, len(refs) - live, nbytes)
 
     def get(self, key: object, default: Any = None) -> Any:
-        pair = self._data.get(id(key))
-        return pair[1] if pair is not None else default
+        slot = self._index.get(id(key))
+        return self._values[slot] if slot is not None and self._refs[slot]() is key else default
+
+    def get_many(self, keys: Iterable[object], default: Any = None) -> list[Any]:
+        keys = list(keys)
+        values, refs = self._values, self._refs
+        slots = map(self._index.get, map(id, keys))
+        return [
+            values[slot] if slot is not None and refs[slot]() is key else default
+            for key, slot in zip(keys, slots, strict=True)
+        ]
+
+    def set_many(self, items: Iterable[tuple[object, Any]]) -> None:
+        index, values, refs = self._index, self._values, self._refs
+        for key, value in items:
+            slot = index.get(id(key))
+            if slot is not None and refs[slot]() is key:
+                values[slot] = value
+            else:
+                self[key] = value
+
+    def compact(self) -> int:
+        """Release the slots whose instance died before its callback ran. Returns the number of slots released."""
+        dead = [(ref.key, slot) for slot, ref in enumerate(self._refs) if ref is not None and ref() is None]
+        for obj_id, slot in dead:
+            self._release(obj_id, slot)
+        return len(dead)
+
+    def _live_entries(self) -> Generator[tuple[weakref.KeyedRef, object, int], None, None]:
+        # The callbacks only replace items of the list, it is safe to iterate while they run
+        for slot, ref in enumerate(self._refs):
+            if ref is not None:
+                obj = ref()
+                if obj is not None:
+                    yield ref, obj, slot
 
     def items(self) -> Generator[tuple[object, Any], None, None]:
-        return ((ref(), value) for ref, value in self._data.values())
+        values = self._values
+        return ((obj, values[slot]) for _, obj, slot in self._live_entries())
 
     def values(self) -> Generator[Any, None, None]:
-        return (value for ref, value in self._data.values())
+        values = self._values
+        return (values[slot] for _, _, slot in self._live_entries())
 
     def keys(self) -> Generator[object, None, None]:
-        return (ref() for ref, _ in self._data.values())
+        return (obj for _, obj, _ in self._live_entries())
 
     def valuerefs(self) -> Generator[weakref.ReferenceType]:
-        return (ref for ref, _ in self._data.values())
+        return (ref for ref, _, _ in self._live_entries())
+
+    # ----- Bulk operations -----
+
+    def _live_slots(self) -> list[int]:
+        return list(compress(range(len(self._live)), self._live))
+
+    def _column(self):
+        """A zero-copy NumPy view of the column, to be dropped before the column grows"""
+        return numpy.frombuffer(self._values, dtype=numpy.dtype(self.typecode))
+
+    def to_array(self):
+        """
+        Copy the live values, in slot order: a NumPy array if NumPy is installed, an `array.array` otherwise.
+        """
+        if numpy is not None:
+            values = self._column()
+            return values[numpy.frombuffer(self._live, dtype=bool)]
+        return array(self.typecode, compress(self._values, self._live))
+
+    def sum(self) -> Any:
+        """The sum of the live values (free slots hold 0)"""
+        if numpy is not None:
+            return self._column().sum().item()
+        return sum(self._values)
+
+    def filter(self, predicate: Callable[[Any], Any]) -> list[object]:
+        """
+        The instances whose value satisfies the predicate, called once per live value, with or without NumPy.
+        See mask for a vectorized predicate.
+        """
+        refs, values = self._refs, self._values
+        # The pairs are collected first, the predicate may add instances to the registry
+        pairs = [(refs[slot](), values[slot]) for slot in self._live_slots()]
+        # An instance may be dead before its callback frees the slot
+        return [obj for obj, value in pairs if obj is not None and predicate(value)]
+
+    def mask(self, vectorized: Callable[[Any], Any]) -> list[object]:
+        """
+        The instances selected by a vectorized predicate, called once with a NumPy array of the live values
+        (a copy, the column can grow while it exists) and returning a boolean mask of the same length,
+        e.g. `lambda values: (values > 10) & (values < 30)`. Requires NumPy, see filter otherwise.
+        """
+        if numpy is None:
+            raise ImportError("ColumnRegistry.mask requires NumPy, use filter with a per-value predicate")
+        live_slots = numpy.flatnonzero(numpy.frombuffer(self._live, dtype=bool))
+        values = self._column()[live_slots]  # Fancy indexing copies, no view of the column outlives this line
+        objects = [self._refs[slot]() for slot in live_slots.tolist()]
+        selected = numpy.asarray(vectorized(values), dtype=bool)
+        if selected.shape != values.shape:
+            raise ValueError(f"The mask has the shape {selected.shape}, expected {values.shape}")
+        return [obj for obj in compress(objects, selected.tolist()) if obj is not None]
+
+    def sort(self, reverse: bool = False) -> list[tuple[object, Any]]:
+        """The (instance, value) pairs sorted by value"""
+        if numpy is not None:
+            live_slots = numpy.flatnonzero(numpy.frombuffer(self._live, dtype=bool))
+            order = live_slots[numpy.argsort(self._column()[live_slots], kind="stable")]
+            slots = (order[::-1] if reverse else order).tolist()
+        else:
+            slots = sorted(self._live_slots(), key=self._values.__getitem__, reverse=reverse)
+        refs, values = self._refs, self._values
+        pairs = [(refs[slot](), values[slot]) for slot in slots]
+        return [pair for pair in pairs if pair[0] is not None]
@@ -0,0 +1,340 @@
+import re
+from typing import Any, Callable, Iterable
+
+from .descriptor_registry import DescriptorRegistry
+
+__all__ = [
+    "Between",
+    "Check",
+    "Field",
+    "Matches",
+    "MaxLen",
+    "MinLen",
+    "OneOf",
+    "Positive",
+    "Typed",
+    "Validated",
+    "Validator",
+    "fields",
+]
+
+STORAGES = ("auto", "dict", "registry")
+MISSING = object()
+
+
+class Validator:
+    """
+    One condition on the value of a Field.
+
+    `condition` is a Python expression on `value`, where `{attribute}` stands for an attribute of the
+    validator, e.g. "{low} <= value <= {high}". The conditions of all the validators of a field are joined
+    into a single expression and compiled, once, when the class is created: a valid value costs no call
+    per validator. `description` completes the error message "... must be <description>".
+    """
+
+    condition = "True"
+    error_type = ValueError
+
+    @property
+    def description(self) -> str:
+        return type(self).__name__
+
+    def error(self, label: str, value: Any) -> Exception:
+        return self.error_type(f"{label} must be {self.description}, got {value!r}")
+
+    def __repr__(self):
+        arguments = ", ".join(map(repr, vars(self).values()))
+        return f"{type(self).__name__}({arguments})"
+
+
+class Typed(Validator):
+    condition = "isinstance(value, {types})"
+    error_type = TypeError
+
+    def __init__(self, *types: type):
+        self.types = types
+
+    @property
+    def description(self) -> str:
+        return f"an instance of {' or '.join(kind.__name__ for kind in self.types)}"
+
+    def __repr__(self):
+        return f"Typed({', '.join(kind.__name__ for kind in self.types)})"
+
+
+class Positive(Validator):
+    condition = "value > 0"
+    description = "positive"
+
+
+class Between(Validator):
+    condition = "{low} <= value <= {high}"
+
+    def __init__(self, low: Any, high: Any):
+        self.low, self.high = low, high
+
+    @property
+    def description(self) -> str:
+        return f"between {self.low!r} and {self.high!r}"
+
+
+class MinLen(Validator):
+    condition = "len(value) >= {length}"
+
+    def __init__(self, length: int):
+        self.length = length
+
+    @property
+    def description(self) -> str:
+        return f"at least {self.length} long"
+
+
+class MaxLen(Validator):
+    condition = "len(value) <= {length}"
+
+    def __init__(self, length: int):
+        self.length = length
+
+    @property
+    def description(self) -> str:
+        return f"at most {self.length} long"
+
+
+class OneOf(Validator):
+    condition = "value in {choices}"
+
+    def __init__(self, *choices: Any):
+        try:
+            self.choices = frozenset(choices)
+        except TypeError:  # Unhashable choices are searched linearly
+            self.choices = choices
+
+    @property
+    def description(self) -> str:
+        return f"one of {', '.join(map(repr, self.choices))}"
+
+    def __repr__(self):
+        return f"OneOf({', '.join(map(repr, self.choices))})"
+
+
+class Matches(Validator):
+    condition = "{pattern}.fullmatch(value) is not None"
+
+    def __init__(self, pattern: str):
+        self.pattern = re.compile(pattern)
+
+    @property
+    def description(self) -> str:
+        return f"matching {self.pattern.pattern!r}"
+
+
+class Check(Validator):
+    """Any predicate, for the conditions the other validators do not cover"""
+
+    condition = "{predicate}(value)"
+    description = ""
+
+    def __init__(self, predicate: Callable[[Any], bool], description: str):
+        self.predicate = predicate
+        self.description = description
+
+
+def compile_condition(validators: Iterable[Validator]) -> tuple[str, dict[str, Any]]:
+    """
+    The conditions of the validators joined with `and`, and the namespace to evaluate it in:
+    the attributes of the n-th validator are renamed _n_<attribute>.
+    """
+    parts, namespace = [], {}
+    for index, validator in enumerate(validators):
+        names = {attribute: f"_{index}_{attribute}" for attribute in vars(validator)}
+        namespace.update((names[attribute], value) for attribute, value in vars(validator).items())
+        parts.append(f"({validator.condition.format(**names)})")
+    return " and ".join(parts) or "True", namespace
+
+
+def compile_function(source: str, name: str, namespace: dict[str, Any]) -> Callable:
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def compile_check(validators: Iterable[Validator]) -> Callable[[Any], bool]:
+    """A function telling whether a value satisfies all the validators"""
+    condition, namespace = compile_condition(validators)
+    return compile_function(f"def check(value):\n    return {condition}\n", "check", namespace)
+
+
+class Field:
+    """
+    A validated attribute, compiled into a `property` when its class is created.
+
+    Validators compose: `Field(Typed(int), Positive())`, or a subclass declaring its own, extended by the
+    ones given to each field:
+
+        class Quantity(Field):
+            validators = (Typed(int), Positive())
+
+        class Order:
+            quantity = Quantity(Between(1, 100), default=1)
+
+    When the class is created (`__set_name__`), the conditions of all the validators are compiled into the
+    setter itself, a single function, with the store of the value inlined. The Field then replaces itself in
+    the class with a plain `property` of the compiled getter and setter: they are called straight from C, with
+    no Python-level `__get__`/`__set__` in between, and the interpreter specializes the reads of an exact
+    `property` (not of a subclass). `fields(cls)` returns the Fields of a class, and the getters link back to
+    theirs, `Order.quantity.fget.field`.
+    The first validator failing raises its error, a TypeError for Typed and a ValueError for the others.
+
+    The values are stored in the instance `__dict__` when the class has one, as the attribute `_<name>`
+    read and written with plain attribute access, also specialized (`__dict__[name]` takes twice as long);
+    otherwise (slotted classes with `__weakref__`) in a DescriptorRegistry per field. `storage="dict"` or
+    `"registry"` forces the choice for one field, and the `storage` keyword of `Validated` for all the fields
+    of a class.
+
+    Reading a field never set returns its default, or raises AttributeError if it has none.
+    A Field belongs to the class it was created in, like the fields of a dataclass.
+    """
+
+    validators: tuple[Validator, ...] = ()
+
+    def __init__(self, *validators: Validator, default: Any = MISSING, storage: str = "auto", doc: str | None = None):
+        if storage not in STORAGES:
+            raise ValueError(f"storage must be one of {', '.join(STORAGES)}, got {storage!r}")
+        self.validators = type(self).validators + validators
+        self.default = default
+        self.storage = storage
+        self.doc = doc
+        self.name = self.owner = self.registry = None
+
+    def __set_name__(self, owner: type, name: str):
+        self.owner, self.name = owner, name
+        self.compile(self.storage)
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner.__name__}.{self.name}"
+
+    @property
+    def attribute(self) -> str:
+        """The instance attribute holding the value with the dict storage"""
+        return f"_{self.name}"
+
+    def resolve_storage(self, storage: str) -> str:
+        has_dict = self.owner.__dictoffset__ != 0
+        if storage == "auto":
+            storage = "dict" if has_dict else "registry"
+        if storage == "dict" and not has_dict:
+            raise TypeError(f"{self.label} cannot be stored in the instance dict, {self.owner.__name__} has none")
+        if storage == "dict" and hasattr(self.owner, self.attribute):
+            raise TypeError(f"{self.label} cannot be stored in the instance dict, it would shadow {self.attribute}")
+        if storage == "registry" and not self.owner.__weakrefoffset__:
+            raise TypeError(f"{self.label} cannot be stored in a registry, {self.owner.__name__} has no __weakref__")
+        return storage
+
+    def compile(self, storage: str) -> None:
+        """Compile the getter and the setter of the field for the given storage"""
+        storage = self.resolve_storage(storage)
+        self._check = compile_check(self.validators)
+        self._predicates = [compile_check([validator]) for validator in self.validators]
+        if self.default is not MISSING:
+            self.check(self.default)
+
+        condition, namespace = compile_condition(self.validators)
+        namespace["_fail"], namespace["_unset"] = self.fail, self.unset
+        if storage == "dict":
+            self.registry = None
+            store = f"instance.{self.attribute} = value"
+            fget = compile_function(
+                f"def fget(instance):\n    try:\n        return instance.{self.attribute}\n"
+                "    except AttributeError:\n        return _unset(instance)\n",
+                "fget",
+                namespace,
+            )
+        else:
+            self.registry = namespace["_registry"] = DescriptorRegistry()
+            store = "_registry[instance] = value"
+            fget = self.registry_getter()
+        fset = compile_function(
+            f"def fset(instance, value):\n    if not ({condition}):\n        _fail(value)\n    {store}\n",
+            "fset",
+            namespace,
+        )
+        fget.__name__ = fset.__name__ = self.name
+        fget.field = self
+        setattr(self.owner, self.name, property(fget, fset, None, self.doc))
+        self.storage = storage
+
+    def registry_getter(self) -> Callable[[Any], Any]:
+        get, unset = self.registry.get, self.unset
+
+        def fget(instance):
+            # Not registry[instance]: its KeyError message formats the instance, whose __repr__ may read the field
+            value = get(instance, MISSING)
+            return unset(instance) if value is MISSING else value
+
+        return fget
+
+    def unset(self, instance: Any) -> Any:
+        """The value of a field never set: the default, if any"""
+        if self.default is MISSING:
+            raise AttributeError(f"{type(instance).__name__!r} object has no attribute {self.name!r}")
+        return self.default
+
+    def check(self, value: Any) -> None:
+        """Validate a value without assigning it"""
+        if not self._check(value):
+            self.fail(value)
+
+    def fail(self, value: Any) -> None:
+        """Raise the error of the first validator rejecting the value"""
+        for validator, predicate in zip(self.validators, self._predicates, strict=True):
+            if not predicate(value):
+                raise validator.error(self.label, value)
+        raise ValueError(f"{self.label} rejected {value!r}")
+
+    def __repr__(self):
+        validators = ", ".join(map(repr, self.validators))
+        return f"<{type(self).__name__} {self.label}({validators}) storage={self.storage!r}>"
+
+
+def fields(cls: type) -> dict[str, Field]:
+    """The Fields of a class and of its bases, by name"""
+    found = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            field = getattr(value.fget, "field", None) if isinstance(value, property) else None
+            if isinstance(field, Field):
+                found[name] = field
+            else:
+                found.pop(name, None)
+    return found
+
+
+class Validated:
+    """
+    An optional base class for classes made of Fields: keyword arguments to __init__, a readable __repr__,
+    and the storage of all its fields chosen at once, `class Point(Validated, storage="registry")`.
+    Subclasses declaring `__slots__ = ()` have no `__dict__`, their fields go to registries.
+    """
+
+    __slots__ = ("__weakref__",)
+    _fields: dict[str, Field] = {}
+
+    def __init_subclass__(cls, storage: str | None = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if storage is not None:
+            for field in fields(cls).values():
+                if field.owner is cls:
+                    field.compile(storage)
+        cls._fields = fields(cls)
+
+    def __init__(self, **values: Any):
+        for name, value in values.items():
+            if name not in self._fields:
+                raise TypeError(f"{type(self).__name__} has no field {name!r}")
+            setattr(self, name, value)
+
+    def __repr__(self):
+        missing = object()
+        values = ((name, getattr(self, name, missing)) for name in self._fields)
+        arguments = ", ".join(f"{name}={value!r}" for name, value in values if value is not missing)
+        return f"{type(self).__name__}({arguments})"
@@ -1,13 +1,24 @@
 import importlib
 import json
+import multiprocessing
+import pickle
+import subprocess
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import pytest
+from pydantic import BaseModel
 
 config_meta_module = importlib.import_module("src.2025.07_July.config_meta")
 dispatch_module = importlib.import_module("src.2025.07_July.dispatch")
 
 ConfigMeta = config_meta_module.ConfigMeta
+install_snapshot = config_meta_module.install_snapshot
+ConfigValidationError = config_meta_module.ConfigValidationError
+compile_schema = config_meta_module.compile_schema
 Dispatcher = dispatch_module.Dispatcher
 
 
@@ -91,6 +102,26 @@ def _(fn: str):
     return config_directory, config_name, config_path
 
 
+@create_resource.register("test_typed_getters")
+def _(fn: str):
+    config_directory = Path(__file__).parent
+    config_name = "configs.ini"
+    config_path = config_directory / config_name
+    lines = [
+        "[Globals]",
+        "timeout = 30",
+        "debug = no\n",
+        "[database]",
+        "port = 5432",
+        "ratio = 0.75",
+        "debug = on",
+        "replicas = db1, db2 ,db3",
+        "pool_size = many",
+    ]
+    config_path.write_text("\n".join(lines))
+    return config_directory, config_name, config_path
+
+
 # ----------------------- Fixture ---------------------
 @pytest.fixture(scope="function")
 def resource(request):
@@ -107,6 +138,22 @@ def resource(request):
         pass
 
 
+def build_config_in_worker(config_directory, config_name):
+    """Runs in a process-pool worker, after the configuration file has been removed"""
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    return Config.database.get_int("port"), Config.api.get("log_level")
+
+
+class StringAnnotatedDatabase:
+    """A schema as written under `from __future__ import annotations`: every annotation is a string"""
+
+    host: "str"
+    port: "int"
+
+
 # -------------------- TESTS ---------------------------
 def test_getter(resource):
     config_directory, config_name, _ = resource
@@ -165,3 +212,310 @@ def test_json_without_globals(resource):
     assert Config.database.get("port", cast=int) == 5432
     assert Config.database.get("retries", default="3") == "3"
     assert Config.database.get("retries", cast=int) is None  # it will not fail but it will return the default
+
+
+def test_typed_getters(resource):
+    config_directory, config_name, _ = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    assert Config.database.get_int("port") == 5432
+    assert Config.database.get_int("timeout") == 30  # resolved from Globals
+    assert Config.database.get_float("ratio") == 0.75
+    assert Config.database.get_bool("debug") is True
+    assert Config.globals.get_bool("debug") is False
+    assert Config.database.get_list("replicas") == ("db1", "db2", "db3")
+    assert Config.database.get_int("missing", default="7") == 7  # cast applied to default value
+    missing = object()
+    assert Config.database.get_int("missing", default=missing) is missing  # returned as given when the cast fails
+    assert Config.database.get_bool("missing") is None
+
+    with pytest.raises(ValueError, match="pool_size"):  # cast failures are no longer hidden
+        Config.database.get_int("pool_size")
+
+
+def test_get_caches_cast_values(resource):
+    config_directory, config_name, config_path = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    calls = []
+
+    def counting_int(value):
+        calls.append(value)
+        return int(value)
+
+    assert Config.database.get("port", cast=counting_int) == 5432
+    assert Config.database.get("port", cast=counting_int) == 5432
+    assert calls == ["5432"]  # cast ran only once for the (key, cast) pair
+    assert Config.database.get("port") == "5432"  # a different cast is cached separately
+
+    config_path.write_text(config_path.read_text().replace("port = 5432", "port = 6543"))
+    assert Config.database.get("port", cast=counting_int) == 5432  # served from the cache
+
+    Config.reload()
+    assert Config.database.get("port", cast=counting_int) == 6543  # cache cleared on reload
+    assert Config.database.port == "6543"
+    assert calls == ["5432", "6543"]
+
+
+def test_get_cache_is_bounded(resource, monkeypatch):
+    config_directory, config_name, _ = resource
+    monkeypatch.setattr(config_meta_module, "GET_CACHE_SIZE", 4)
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    for offset in range(10):
+        assert Config.database.get("port", cast=lambda value, offset=offset: int(value) + offset) == 5432 + offset
+        assert len(Config._snapshot.cache) <= 4  # each inline lambda is a new cache key
+
+
+def test_reload_swaps_snapshot_and_notifies(resource):
+    config_directory, config_name, config_path = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    notifications = []
+    Config.subscribe(lambda cls, changed: notifications.append((cls, changed)))
+    pinned = Config.snapshot
+
+    assert Config.reload() == frozenset()  # nothing changed, nobody notified
+    assert notifications == []
+
+    config_path.write_text(config_path.read_text().replace("port = 5432", "port = 6543").replace("retries = 3\n", ""))
+    changed = Config.reload()
+
+    assert changed == {("database", "port"), ("Globals", "retries")}
+    assert notifications == [(Config, changed)]
+    assert Config.snapshot.version == pinned.version + 2
+    assert pinned.lookup("database", "port") == "5432"  # a pinned snapshot is never mutated
+    assert Config.database.get("port") == "6543"
+    assert Config.database.get("retries") is None
+
+
+def test_watch_reloads_in_background(resource):
+    config_directory, config_name, config_path = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    notifications = []
+    Config.subscribe(lambda cls, changed: notifications.append(changed))
+    Config.watch(poll_interval=0.05)
+    try:
+        # Replace the file atomically, as a deploy tool would
+        tmp_path = config_path.with_suffix(".tmp")
+        tmp_path.write_text(config_path.read_text().replace("port = 5432", "port = 65432"))
+        tmp_path.replace(config_path)
+
+        deadline = time.monotonic() + 5
+        while not notifications and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        Config.unwatch()
+
+    assert notifications == [frozenset({("database", "port")})]
+    assert Config.database.get_int("port") == 65432
+
+
+def test_layered_sources(tmp_path, monkeypatch):
+    base_path = tmp_path / "base.ini"
+    base_path.write_text("[Globals]\nlog_level = INFO\ntimeout = 30\n\n[database]\nhost = localhost\nport = 5432\n")
+    env_path = tmp_path / "prod.json"
+    env_path.write_text(json.dumps({"Globals": {"timeout": "60"}, "database": {"host": "db.prod"}, "cache": {}}))
+    monkeypatch.setenv("APP_DATABASE__PORT", "6543")
+    monkeypatch.setenv("APP_GLOBALS__LOG_LEVEL", "WARNING")
+    monkeypatch.setenv("APP_CACHE__TTL", "300")
+    monkeypatch.setenv("APP_IGNORED", "no section separator")
+    env_source = config_meta_module.EnvSource("APP_")
+
+    class Config(metaclass=ConfigMeta, config_sources=[base_path, env_path, env_source]):
+        pass
+
+    assert Config.config_path == env_path
+    assert Config.config_paths == (base_path, env_path)
+    assert Config.database.host == "db.prod"  # the json overrides the ini
+    assert Config.database.get_int("port") == 6543  # environment variables override the files
+    assert Config.database.get("timeout") == "60"  # Globals are layered too
+    assert Config.cache.get_int("ttl") == 300
+    assert Config.cache.get("log_level") == "WARNING"
+
+    snapshot = Config.snapshot
+    assert snapshot.resolved["database"] == {"host": "db.prod", "port": "6543", "log_level": "WARNING", "timeout": "60"}
+    assert snapshot.origins["database", "host"] == str(env_path)
+    assert snapshot.origins["database", "port"] == "EnvSource(prefix='APP_')"
+    assert snapshot.origins["Globals", "log_level"] == "EnvSource(prefix='APP_')"
+
+
+def test_snapshot_rebuilds_class_without_filesystem(resource):
+    config_directory, config_name, config_path = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        pass
+
+    payload = pickle.dumps(Config.snapshot)
+    snapshot = pickle.loads(payload)
+    assert snapshot.sections == Config.snapshot.sections
+    assert snapshot.resolved == Config.snapshot.resolved
+    assert snapshot.cache == {}
+
+    # Workers rebuild the section classes from the snapshot, even if the file can not be found
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=install_snapshot,
+        initargs=(snapshot,),
+    ) as executor:
+        config_text = config_path.read_text()
+        config_path.unlink()
+        try:
+            result = executor.submit(build_config_in_worker, config_directory, config_name).result(timeout=60)
+        finally:
+            config_path.write_text(config_text)
+
+    assert result == (5432, "INFO")
+
+
+def test_configuration_is_loaded_on_first_access(tmp_path):
+    class Config(metaclass=ConfigMeta, config_directory=tmp_path, config_filename="later.ini"):
+        pass
+
+    assert type(Config) is not ConfigMeta and Config.__doc__ is None  # nothing has been read yet
+    with pytest.raises(FileNotFoundError, match="later.ini"):
+        _ = Config.database
+    (tmp_path / "later.ini").write_text("[database]\nport = 5432\n")
+    assert Config.database.get_int("port") == 5432
+    assert type(Config) is ConfigMeta and Config.config_path == tmp_path / "later.ini"
+
+
+def test_snapshot_reaches_module_level_classes_of_spawned_workers(tmp_path):
+    # Spawn workers import the main module, and with it the configuration class, before install_snapshot runs
+    (tmp_path / "configs.ini").write_text("[database]\nport = 5432\n")
+    (tmp_path / "appconfig.py").write_text(textwrap.dedent("""
+            import importlib
+            from pathlib import Path
+
+            ConfigMeta = importlib.import_module("src.2025.07_July.config_meta").ConfigMeta
+
+
+            class Config(metaclass=ConfigMeta, config_directory=Path(__file__).parent, config_filename="configs.ini"):
+                pass
+
+
+            def read_port():
+                return Config.database.get_int("port")
+            """))
+    (tmp_path / "main.py").write_text(textwrap.dedent("""
+            import importlib
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            from appconfig import Config, read_port
+
+            install_snapshot = importlib.import_module("src.2025.07_July.config_meta").install_snapshot
+
+            if __name__ == "__main__":
+                snapshot = Config.snapshot
+                (Config.config_path).unlink()
+                with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=install_snapshot,
+                    initargs=(snapshot,),
+                ) as executor:
+                    print(executor.submit(read_port).result(timeout=60))
+            """))
+    env = {"PYTHONPATH": str(Path(__file__).parent.parent), "PATH": ""}
+    completed = subprocess.run(
+        [sys.executable, "main.py"], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "5432"
+
+
+def test_schema_validated_when_loaded(resource):
+    config_directory, config_name, config_path = resource
+
+    class DatabaseSchema(BaseModel):
+        host: str
+        port: int
+        log_level: str
+        retries: int  # resolved from Globals
+        pool_size: int = 10
+
+    class ApiSchema:
+        timeout: float
+        token: str
+        verify: bool = True
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        database: DatabaseSchema
+        api: ApiSchema
+
+    assert Config.database.port == 5432
+    assert Config.database.retries == 3
+    assert Config.database.pool_size == 10
+    assert Config.database.username == "admin"  # keys without a schema field stay raw strings
+    assert Config.api.timeout == 10.0
+    assert Config.api.verify is True
+    assert Config.database.get("port") == 5432
+    assert Config.globals.timeout == "30"  # sections without a schema are untouched
+
+    with pytest.raises(AttributeError, match="frozen"):
+        Config.database.port = 1
+
+    config_path.write_text(config_path.read_text().replace("port = 5432", "port = not-a-port"))
+    with pytest.raises(ConfigValidationError, match=r"\[database\]"):
+        Config.reload()
+    assert Config.database.port == 5432  # the previous snapshot stays in place
+
+    class InvalidConfig(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        database: DatabaseSchema
+
+    with pytest.raises(ConfigValidationError, match="port"):
+        _ = InvalidConfig.database
+
+
+def test_string_annotations_are_resolved(resource):
+    config_directory, config_name, config_path = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        database: "StringAnnotatedDatabase"
+
+    assert Config.database.port == 5432
+
+    config_path.write_text(config_path.read_text().replace("port = 5432", "port = notanint"))
+
+    class InvalidConfig(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        database: "StringAnnotatedDatabase"
+
+    with pytest.raises(ConfigValidationError, match="port"):
+        _ = InvalidConfig.database
+
+    class UnresolvedConfig(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        database: "UndefinedSchema"  # noqa: F821
+
+    with pytest.raises(TypeError, match="Cannot resolve the annotation of UnresolvedConfig.database"):
+        _ = UnresolvedConfig.database
+
+    with pytest.raises(TypeError, match="Cannot resolve the annotation of UnresolvedSchema.port"):
+
+        class UnresolvedSchema:
+            host: "str"
+            port: "UndefinedType"  # noqa: F821
+
+        compile_schema(UnresolvedSchema)
+
+
+def test_unresolved_annotations_of_other_attributes_are_ignored(resource):
+    config_directory, config_name, _ = resource
+
+    class Config(metaclass=ConfigMeta, config_directory=config_directory, config_filename=config_name):
+        log: "Logger"  # noqa: F821 (imported under TYPE_CHECKING only)
+        database: "StringAnnotatedDatabase"
+
+    assert Config.database.port == 5432 and set(Config._schemas) == {"database"}
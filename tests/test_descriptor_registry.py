@@ -1,9 +1,14 @@
+import gc
 import importlib
+import threading
 import weakref
 
 import pytest
 
-DescriptorRegistry = importlib.import_module("src.2025.08_August.descriptor_registry").DescriptorRegistry
+descriptor_registry = importlib.import_module("src.2025.08_August.descriptor_registry")
+DescriptorRegistry = descriptor_registry.DescriptorRegistry
+ColumnRegistry = descriptor_registry.ColumnRegistry
+ThreadSafeDescriptorRegistry = descriptor_registry.ThreadSafeDescriptorRegistry
 
 
 # --- Test Fixtures ---
@@ -28,6 +33,44 @@ class SlotsWithWeakref:
         self.name = name
 
 
+# --- Stress Test Helpers ---
+
+ROUNDS = 300
+
+
+def report_errors(target, errors):
+    """Run the target in a thread, collecting its exceptions for the main thread"""
+
+    def run(*args):
+        try:
+            target(*args)
+        except Exception as error:
+            errors.append(error)
+
+    return run
+
+
+def write_rounds(registry, objects):
+    for round_ in range(ROUNDS):
+        for obj in objects:
+            registry[obj] = round_
+            assert registry[obj] == round_
+        # Short-lived instances, collected (running their callbacks) while the other threads work
+        temporaries = [NoSlots("tmp") for _ in range(8)]
+        for obj in temporaries:
+            registry[obj] = -1
+        del temporaries
+        if round_ % 50 == 0:
+            gc.collect()
+
+
+def read_until(registry, stop):
+    while not stop.is_set():
+        for obj, value in registry.items():
+            assert obj is not None
+            assert value == -1 or 0 <= value < ROUNDS
+
+
 # --- Test Class ---
 
 
@@ -88,7 +131,9 @@ class TestDescriptorRegistry:
     def test_repr(self):
         obj = NoSlots("A")
         self.registry[obj] = "x"
-        assert "DescriptorRegistry" in repr(self.registry)
+        text = repr(self.registry)
+        assert "DescriptorRegistry" in text and "entries=1" in text
+        assert "'x'" not in text and "NoSlots" not in text  # the contents are never dumped
 
     def test_cleanup_on_object_deletion(self):
         obj = NoSlots("temp")
@@ -99,3 +144,334 @@ class TestDescriptorRegistry:
         # Delete reference
         del obj
         assert key_id not in self.registry._data
+
+    def test_setitem_reuses_the_weakref(self):
+        obj = NoSlots("A")
+        self.registry[obj] = "first"
+        (ref,) = self.registry.valuerefs()
+        self.registry[obj] = "second"
+        assert self.registry[obj] == "second"
+        assert next(self.registry.valuerefs()) is ref
+        assert len(self.registry._data) == 1
+
+    def test_callback_does_not_keep_registry_alive(self):
+        obj = NoSlots("A")
+        self.registry[obj] = "value"
+        registry_ref = weakref.ref(self.registry)
+        del self.registry
+        assert registry_ref() is None
+        del obj  # the callback finds no registry
+
+    def test_get_many_set_many(self):
+        objects = [NoSlots(index) for index in range(5)]
+        self.registry.set_many(zip(objects[:4], range(4), strict=True))
+        self.registry.set_many([(objects[0], 10)])
+        assert self.registry.get_many(objects, default=-1) == [10, 1, 2, 3, -1]
+
+    def test_iterators_skip_dead_entries(self):
+        objects = [NoSlots(index) for index in range(3)]
+        for index, obj in enumerate(objects):
+            self.registry[obj] = index
+        items = self.registry.items()
+        first = next(items)
+        dying = next(obj for obj in objects if obj is not first[0])
+        objects.remove(dying)
+        del dying
+        assert [first, *items] == [(obj, obj.name) for obj in objects]
+        assert sorted(self.registry.values()) == [obj.name for obj in objects]
+
+    def test_compact(self):
+        a, b = NoSlots("A"), NoSlots("B")
+        self.registry.set_many([(a, 1), (b, 2)])
+        assert self.registry.compact() == 0
+        self.registry._iterating = 1  # the callback of b is deferred, as during an iteration
+        del b
+        with pytest.raises(RuntimeError, match="while it is being iterated"):
+            self.registry.compact()
+        self.registry._iterating = 0
+        assert len(self.registry._data) == 2
+        assert self.registry.compact() == 1
+        assert list(self.registry.items()) == [(a, 1)]
+
+    def test_stats(self):
+        a, b = NoSlots("A"), NoSlots("B")
+        self.registry.set_many([(a, "x" * 1000), (b, 2)])
+        stats = self.registry.stats()
+        assert (stats["live"], stats["dead"], len(self.registry)) == (2, 0, 2)
+        assert stats["approx_bytes"] > 1000 and stats["growth_per_second"] > 0
+        assert stats["name"] is None and stats["type"] == type(self.registry).__name__
+        del b
+        stats = self.registry.stats()
+        assert (stats["live"], stats["dead"]) == (1, 0) and stats["growth_per_second"] < 0
+
+    def test_stats_count_dead_entries(self):
+        a = NoSlots("A")
+        self.registry[a] = 1
+        self.registry._iterating = 1  # the callback of a is deferred, as during an iteration
+        del a
+        stats = self.registry.stats()
+        assert (stats["live"], stats["dead"], len(self.registry)) == (0, 1, 0)
+        self.registry._iterating = 0
+        assert self.registry.compact() == 1
+
+    def reuse_id(self, old, new):
+        """Moves the entry of old to the id of new, as if new reused the id before the callback of old ran"""
+        self.registry._data[id(new)] = self.registry._data.pop(id(old))
+
+    def test_lookups_check_the_identity(self):
+        a, b = NoSlots("A"), NoSlots("B")
+        self.registry[a] = "stale"
+        self.reuse_id(a, b)
+        assert b not in self.registry
+        assert self.registry.get(b, "default") == "default"
+        assert self.registry.get_many([b]) == [None]
+        with pytest.raises(KeyError):
+            self.registry[b]
+        self.registry[b] = "fresh"
+        assert self.registry[b] == "fresh" and self.registry.get_many([b]) == ["fresh"]
+        del a
+        assert self.registry[b] == "fresh"
+        self.reuse_id(b, a := NoSlots("A"))
+        self.registry.set_many([(a, "set_many")])
+        assert self.registry[a] == "set_many"
+
+
+class TestThreadSafeDescriptorRegistry(TestDescriptorRegistry):
+    """The DescriptorRegistry tests, plus concurrency"""
+
+    def setup_method(self):
+        self.registry = ThreadSafeDescriptorRegistry(stripes=4)
+
+    def test_stats_count_dead_entries(self):
+        a = NoSlots("A")
+        self.registry[a] = 1
+        dead = weakref.KeyedRef(NoSlots("dead"), None, 1)  # as if its callback had not run yet
+        self.registry._shards[0][1] = [dead, 2]
+        stats = self.registry.stats()
+        assert (stats["live"], stats["dead"], len(self.registry)) == (1, 1, 2)
+        assert self.registry.compact() == 1
+
+    def reuse_id(self, old, new):
+        shards, stripe = self.registry._shards, self.registry._stripe
+        shards[stripe(id(new))][id(new)] = shards[stripe(id(old))].pop(id(old))
+
+    def test_setitem_reuses_the_weakref(self):
+        obj = NoSlots("A")
+        self.registry[obj] = "first"
+        (ref,) = self.registry.valuerefs()
+        self.registry[obj] = "second"
+        assert self.registry[obj] == "second"
+        assert next(self.registry.valuerefs()) is ref
+
+    def test_cleanup_on_object_deletion(self):
+        obj = NoSlots("temp")
+        self.registry[obj] = "z"
+        del obj
+        assert list(self.registry.items()) == []
+
+    def test_iterators_skip_dead_entries(self):
+        objects = [NoSlots(index) for index in range(3)]
+        self.registry.set_many((obj, obj.name) for obj in objects)
+        items = self.registry.items()
+        first = next(items)
+        objects.clear()
+        # The snapshot holds the instances until the iteration ends
+        assert sorted(value for _, value in [first, *items]) == [0, 1, 2]
+        del first, items
+        assert list(self.registry.items()) == []
+
+    def test_compact(self):
+        a = NoSlots("A")
+        self.registry.set_many([(a, 1)])
+        assert self.registry.compact() == 0
+        assert list(self.registry.items()) == [(a, 1)]
+
+    def test_callbacks_take_no_lock(self):
+        # The last reference to an instance may be dropped while its shard is locked by another thread,
+        # e.g. when it is the value replaced by a writer of another shard
+        obj = NoSlots("A")
+        self.registry[obj] = 1
+        lock = self.registry._locks[self.registry._stripe(id(obj))]
+        held, release = threading.Event(), threading.Event()
+
+        def hold():
+            with lock:
+                held.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+        owner = [obj]
+        del obj
+        dropper = threading.Thread(target=owner.clear)
+        dropper.start()
+        dropper.join(timeout=5)
+        blocked = dropper.is_alive()
+        release.set()
+        holder.join()
+        dropper.join()
+        assert not blocked
+        assert len(self.registry) == 0 and len(self.registry._pending_removals) == 1
+        assert list(self.registry.items()) == []
+        assert self.registry._pending_removals == [] and not any(self.registry._shards)
+
+    def test_stripes_must_be_a_power_of_two(self):
+        with pytest.raises(ValueError, match="power of two"):
+            ThreadSafeDescriptorRegistry(stripes=3)
+
+    def test_concurrent_writers_readers_and_collection(self):
+        keep = [NoSlots(index) for index in range(64)]
+        errors = []
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=report_errors(write_rounds, errors), args=(self.registry, keep[offset::4]))
+            for offset in range(4)
+        ]
+        threads.append(threading.Thread(target=report_errors(read_until, errors), args=(self.registry, stop)))
+        for thread in threads:
+            thread.start()
+        for thread in threads[:-1]:
+            thread.join()
+        stop.set()
+        threads[-1].join()
+
+        assert errors == []
+        gc.collect()
+        assert sorted(self.registry.values()) == [ROUNDS - 1] * 64
+
+
+class TestColumnRegistry:
+
+    @pytest.fixture(autouse=True, params=["numpy", "pure_python"])
+    def registry(self, request, monkeypatch):
+        if request.param == "pure_python":
+            monkeypatch.setattr(descriptor_registry, "numpy", None)
+        self.registry = ColumnRegistry()
+        self.objects = [NoSlots(name) for name in "ABCDE"]
+        for obj, price in zip(self.objects, [3.0, 1.5, 4.0, 1.0, 5.0], strict=True):
+            self.registry[obj] = price
+
+    def test_set_get(self):
+        a = self.objects[0]
+        assert self.registry[a] == 3.0 and a in self.registry and len(self.registry) == 5
+        self.registry[a] = 7
+        assert self.registry[a] == 7.0 and self.registry.get(NoSlots("X"), -1) == -1
+        with pytest.raises(TypeError):
+            self.registry[a] = "not a number"
+        assert self.registry[a] == 7.0
+
+    def test_bulk_operations(self):
+        a, b, c, d, e = self.objects
+        assert self.registry.sum() == 14.5
+        assert self.registry.filter(lambda value: value > 2) == [a, c, e]
+        assert self.registry.sort() == [(d, 1.0), (b, 1.5), (a, 3.0), (c, 4.0), (e, 5.0)]
+        assert [obj for obj, _ in self.registry.sort(reverse=True)] == [e, c, a, b, d]
+        assert list(self.registry.to_array()) == [3.0, 1.5, 4.0, 1.0, 5.0]
+        assert self.registry.filter(lambda value: 1 < value < 4) == [a, b]
+        assert self.registry.filter(lambda value: value in {1.0, 5.0}) == [d, e]
+
+    def test_mask(self):
+        a, b, c, d, e = self.objects
+        if descriptor_registry.numpy is None:
+            with pytest.raises(ImportError, match="requires NumPy"):
+                self.registry.mask(lambda values: values > 2)
+            return
+        assert self.registry.mask(lambda values: (values > 1) & (values < 4)) == [a, b]
+        with pytest.raises(ValueError, match="shape"):
+            self.registry.mask(lambda values: values[:2] > 0)
+
+    def test_bulk_operations_skip_dead_instances(self):
+        a, b, c, d, e = self.objects
+        slot = self.registry._index[id(c)]
+        # As if c had died and its callback had not run yet
+        self.registry._refs[slot] = weakref.KeyedRef(NoSlots("dead"), None, id(c))
+        assert self.registry.filter(lambda value: value > 2) == [a, e]
+        assert [obj for obj, _ in self.registry.sort()] == [d, b, a, e]
+        if descriptor_registry.numpy is not None:
+            assert self.registry.mask(lambda values: values > 2) == [a, e]
+
+    def test_predicates_may_add_instances(self):
+        added = []
+
+        def predicate(value):
+            added.append(NoSlots("new"))
+            self.registry[added[-1]] = value  # grows the column while the bulk operation runs
+            return value > 2
+
+        assert len(self.registry.filter(predicate)) == 3
+        if descriptor_registry.numpy is not None:
+            assert len(self.registry.mask(lambda values: [predicate(value) for value in values])) == 6
+
+    def test_bulk_get_set_and_compact(self):
+        a, b = self.objects[:2]
+        self.registry.set_many([(a, 10), (NoSlots("new"), 1)])
+        assert self.registry.get_many([a, b, NoSlots("X")], default=-1) == [10.0, 1.5, -1]
+        assert len(self.registry) == 5  # the new instance was collected right away
+        assert self.registry.compact() == 0
+
+    def test_slots_are_freed_and_reused(self):
+        c = self.objects.pop(2)
+        del c
+        assert len(self.registry) == 4
+        assert self.registry.sum() == 10.5
+        assert list(self.registry.values()) == [3.0, 1.5, 1.0, 5.0]
+        assert [obj.name for obj in self.registry.filter(lambda value: value > 0)] == ["A", "B", "D", "E"]
+
+        f = NoSlots("F")
+        self.registry[f] = 2.0
+        assert len(self.registry._values) == 5  # the freed slot was reused
+        assert [obj.name for obj, _ in self.registry.sort()] == ["D", "B", "F", "A", "E"]
+        assert dict(self.registry.items())[f] == 2.0
+
+    def test_lookups_check_the_identity(self):
+        a, b = self.objects[0], NoSlots("B")
+        index = self.registry._index
+        index[id(b)] = index.pop(id(a))  # as if b reused the id of a before its callback ran
+        assert b not in self.registry and a not in self.registry
+        assert self.registry.get(b, -1) == -1 and self.registry.get_many([b], default=-1) == [-1]
+        with pytest.raises(KeyError):
+            self.registry[b]
+        self.registry[b] = 9
+        assert self.registry[b] == 9.0 and len(self.registry) == 5
+        assert len(self.registry._values) == 5  # the slot of the stale entry was reused
+
+    def test_stats(self):
+        stats = self.registry.stats()
+        assert (stats["live"], stats["dead"]) == (5, 0)
+        assert stats["approx_bytes"] > 5 * 8 and stats["growth_per_second"] > 0
+        del self.objects[:2]
+        assert self.registry.stats()["live"] == 3
+
+
+class TestTracking:
+
+    @pytest.fixture(autouse=True)
+    def reset_tracking(self):
+        yield
+        descriptor_registry.track_new_registries(False)
+        descriptor_registry._tracked.clear()
+
+    def test_largest_registries(self):
+        small, large = DescriptorRegistry(), ColumnRegistry()
+        descriptor_registry.track(small, "small")
+        descriptor_registry.track(large, "large")
+        keep = [NoSlots(index) for index in range(3)]
+        small[keep[0]] = 1
+        large.set_many((obj, 1.0) for obj in keep)
+        assert descriptor_registry.largest_registries() == [
+            {"name": "large", "type": "ColumnRegistry", "entries": 3},
+            {"name": "small", "type": "DescriptorRegistry", "entries": 1},
+        ]
+        assert small.stats()["name"] == "small"
+        descriptor_registry.untrack(small)
+        assert [size["name"] for size in descriptor_registry.largest_registries(count=5)] == ["large"]
+
+    def test_track_new_registries(self):
+        descriptor_registry.track_new_registries()
+        registry = ThreadSafeDescriptorRegistry()
+        (size,) = descriptor_registry.largest_registries()
+        assert size["name"].startswith("ThreadSafeDescriptorRegistry@") and size["entries"] == 0
+        del registry
+        gc.collect()
+        assert descriptor_registry.largest_registries() == []  # the tracking does not keep registries alive
@@ -1,13 +1,35 @@
+import asyncio
+import contextlib
+import copy
+import gc
 import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import threading
+import warnings
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
 
 import pytest
 
 dispatch_module = importlib.import_module("src.2025.07_July.dispatch")
 Dispatcher = dispatch_module.Dispatcher
+ANY = dispatch_module.ANY
 
 # ----- Fixtures -----
 
 
+def square(value):
+    """Module-level handler, picklable for the process pool tests"""
+    return value * value
+
+
+def square_batch(values):
+    return [(value * value, os.getpid()) for value in values]
+
+
 @pytest.fixture(scope="session")
 def unregistered_key():
     class UnregisteredKey(KeyError):
@@ -200,3 +222,540 @@ def test_dispatcher_as_class_method(person_with_dispatcher, unregistered_key):
 
     with pytest.raises(unregistered_key):
         charlie.talk("Charlie")
+
+
+def test_key_names_keep_their_order(unregistered_key):
+    def fallback_fn(**kwargs):
+        raise unregistered_key("Not a registered key")
+
+    dispatcher = Dispatcher(fallback_fn, key_names=["region", "product"])
+
+    @dispatcher.register(("eu", "x"))
+    def _(**kwargs):
+        return "eu-x"
+
+    assert dispatcher(product="x", region="eu") == "eu-x"
+    assert dispatcher.extract_key((), {"region": "eu", "product": "x", "other": 1}) == ("eu", "x")
+    assert Dispatcher(fallback_fn, key_names="region").extract_key((), {"region": "eu"}) == ("eu",)
+
+    with pytest.raises(TypeError, match="Missing required keyword arguments"):
+        dispatcher(region="eu")
+
+
+def test_changing_settings_recompiles_key_extraction():
+    dispatcher = Dispatcher(lambda *args: "fallback")
+    assert dispatcher.extract_key(("a", "b"), {}) == "a"
+
+    dispatcher.key_idx = 1
+    assert dispatcher.extract_key(("a", "b"), {}) == "b"
+
+    dispatcher.key_idx = [1, 0]
+    assert dispatcher.extract_key(("a", "b"), {}) == ("b", "a")
+
+    dispatcher.key_generator = lambda first, second: first + second  # positional arguments in key_idx order
+    assert dispatcher.extract_key(("a", "b"), {}) == "ba"
+
+    dispatcher.key_idx = [0]
+    dispatcher.key_generator = None
+    assert dispatcher.extract_key(("a", "b"), {}) == ("a",)
+
+
+def test_type_dispatch_through_mro(unregistered_key):
+    from collections.abc import Mapping, Sequence
+
+    def fallback_fn(value):
+        raise unregistered_key("Not a registered key")
+
+    dispatcher = Dispatcher(fallback_fn, by_type=True)
+
+    class Animal:
+        pass
+
+    class Dog(Animal):
+        pass
+
+    class Puppy(Dog):
+        pass
+
+    @dispatcher.register(Animal)
+    def _(value):
+        return "animal"
+
+    @dispatcher.register(Sequence)
+    def _(value):
+        return "sequence"
+
+    assert dispatcher(Puppy()) == "animal"  # resolved through the MRO
+    assert dispatcher([1, 2]) == "sequence"  # and through ABCs
+    assert dispatcher.get_function(Puppy)(None) == "animal"
+    with pytest.raises(unregistered_key):
+        dispatcher({})
+
+    @dispatcher.register(Dog)
+    def _(value):
+        return "dog"
+
+    assert dispatcher(Puppy()) == "dog"  # the cached resolution is invalidated on register
+
+    @dispatcher.register(Mapping)
+    def _(value):
+        return "mapping"
+
+    class Registry:
+        pass
+
+    with pytest.raises(unregistered_key):
+        dispatcher(Registry())
+    Mapping.register(Registry)
+    assert dispatcher(Registry()) == "mapping"  # virtual subclasses invalidate the cache, like in singledispatch
+
+    with pytest.raises(TypeError, match="Only classes"):
+        dispatcher.register("dog")
+
+
+def test_functools_mro_helpers():
+    # resolve_type relies on private helpers of functools.singledispatch, fail loudly if they change
+    from collections.abc import Iterable, Mapping, Sequence, Sized
+    from functools import singledispatch
+
+    assert list(inspect.signature(dispatch_module._compose_mro).parameters) == ["cls", "types"]
+    assert list(inspect.signature(dispatch_module._find_impl).parameters) == ["cls", "registry"]
+    assert dispatch_module._compose_mro(list, [Sized, Iterable]) == [list, Sized, Iterable, object]
+
+    registry = {object: "object", Sequence: "sequence", Mapping: "mapping", int: "int"}
+    reference = singledispatch(lambda value: "object")
+    for cls, name in registry.items():
+        reference.register(cls, lambda value, name=name: name)
+    for cls in [bool, list, tuple, dict, str, float, type(None)]:
+        assert dispatch_module._find_impl(cls, registry) == reference.dispatch(cls)(None)
+        assert dispatch_module.resolve_type(cls, registry) == reference.dispatch(cls)(None)
+
+
+def test_registry_changes_update_the_indexes(unregistered_key):
+    def fallback_fn(value):
+        raise unregistered_key("Not a registered key")
+
+    dispatcher = Dispatcher(fallback_fn, by_type=True)
+    dispatcher.register(int)(lambda value: "int")
+    dispatcher.register(object)(lambda value: "object")
+    assert dispatcher(True) == "int"  # the resolution of bool is cached
+
+    with pytest.raises(TypeError):
+        dispatcher.registry[int] = lambda value: "new"  # read-only, it would bypass the cache
+    assert dispatcher.unregister(int)(1) == "int"
+    assert dispatcher(True) == "object"
+    with pytest.raises(KeyError):
+        dispatcher.unregister(int)
+
+    handlers = {int: lambda value: "new"}
+    dispatcher.registry = handlers
+    handlers[int] = lambda value: "changed later"  # the dispatcher keeps a copy
+    assert dispatcher(True) == "new" and dict(dispatcher.registry) == {int: dispatcher.get_function(int)}
+    with pytest.raises(unregistered_key):
+        dispatcher("x")
+
+
+def test_type_dispatch_on_multiple_keys(unregistered_key):
+    def fallback_fn(first, second):
+        raise unregistered_key("Not a registered key")
+
+    dispatcher = Dispatcher(fallback_fn, key_idx=[0, 1], by_type=True)
+
+    @dispatcher.register((object, int))
+    def _(first, second):
+        return "any-int"
+
+    @dispatcher.register((str, object))
+    def _(first, second):
+        return "str-any"
+
+    @dispatcher.register((str, bool))
+    def _(first, second):
+        return "str-bool"
+
+    assert dispatcher(1.5, 2) == "any-int"
+    assert dispatcher("a", 2.5) == "str-any"
+    assert dispatcher("a", True) == "str-bool"
+    assert dispatcher.extract_key(("a", True), {}) == (str, bool)
+
+    with pytest.raises(RuntimeError, match="Ambiguous"):
+        dispatcher("a", 2)  # (object, int) and (str, object) are both as specific
+
+    named = Dispatcher(fallback_fn, key_names=["first"], by_type=True)
+    named.register((int,))(lambda first, second: "int")
+    assert named(first=True, second=None) == "int"
+
+
+def test_dispatch_many_groups_by_key():
+    batches = []
+
+    @Dispatcher
+    def route(record):
+        return f"fallback:{record}"
+
+    @route.register("a", batch=True)
+    def _(records):
+        batches.append(records)
+        return [record.upper() for record in records]
+
+    @route.register("b")
+    def _(record):
+        return record * 2
+
+    records = ["a", "b", "c", "a", "b", "a"]
+    assert route.dispatch_many(records) == ["A", "bb", "fallback:c", "A", "bb", "A"]  # input order
+    assert batches == [["a", "a", "a"]]  # one call for the whole group
+    assert route("a") == "A"  # a batch function still handles single calls
+    assert route.dispatch_many([]) == []
+
+
+def test_dispatch_many_unpacking(multi_arg_index_dispatcher, reversed_keyname_dispatcher):
+    rows = [("a", "b", "x"), ("c", "d", "x"), ("a", "b", "y")]
+    assert multi_arg_index_dispatcher.dispatch_many(rows, unpack="args") == ["Case1: a-b", "Case2: c-d", "Case1: a-b"]
+
+    records = [{"key1": "a", "key2": "b"}, {"key1": None, "key2": ""}]
+    assert reversed_keyname_dispatcher.dispatch_many(records, unpack="kwargs") == [
+        "Reversed order: a, b",
+        "Empty values: key1=None, key2=",
+    ]
+
+    @reversed_keyname_dispatcher.register(("d", "c"), batch=True)
+    def _(records):
+        return []  # does not return one result per record
+
+    with pytest.raises(ValueError, match="returned 0 results for 1 items"):
+        reversed_keyname_dispatcher.dispatch_many([{"key1": "c", "key2": "d"}], unpack="kwargs")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_async_mixes_sync_and_async_handlers():
+    threads = {}
+
+    @Dispatcher
+    def fetch(item):
+        threads["fallback"] = threading.current_thread()
+        return f"sync:{item}"
+
+    @fetch.register("slow")
+    async def _(item):
+        await asyncio.sleep(0.01)
+        return f"async:{item}"
+
+    assert await fetch.dispatch_async("slow") == "async:slow"
+    assert await fetch.dispatch_async("other") == "sync:other"
+    assert threads["fallback"] is not threading.main_thread()  # offloaded, the event loop was not blocked
+
+
+@pytest.mark.asyncio
+async def test_dispatch_many_async_bounds_concurrency():
+    running = peak = 0
+
+    @Dispatcher
+    async def fetch(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item * 2
+
+    @fetch.register(0)
+    def _(item):
+        return "zero"
+
+    assert await fetch.dispatch_many_async(range(10), limit=3) == ["zero", 2, 4, 6, 8, 10, 12, 14, 16, 18]
+    assert peak == 3
+
+    @fetch.register(5)
+    async def _(item):
+        raise RuntimeError("failed")
+
+    with pytest.raises(ExceptionGroup):
+        await fetch.dispatch_many_async(range(10))
+
+
+@pytest.mark.asyncio
+async def test_dispatch_async_awaits_wrapped_coroutine_functions():
+    @Dispatcher
+    def fetch(item):
+        return f"sync:{item}"
+
+    @fetch.register("batch", batch=True)
+    async def _(items):
+        await asyncio.sleep(0)
+        return [f"batch:{item}" for item in items]
+
+    @fetch.register("pooled", executor="thread")
+    async def _(item):
+        await asyncio.sleep(0)
+        return f"pooled:{item}"
+
+    try:
+        assert await fetch.dispatch_async("batch") == "batch:batch"
+        assert await fetch.dispatch_async("pooled") == "pooled:pooled"
+        assert await fetch.dispatch_many_async(["batch", "pooled", "x"]) == ["batch:batch", "pooled:pooled", "sync:x"]
+        assert fetch("pooled").result() == "pooled:pooled"  # a Future of the result, not of a coroutine
+    finally:
+        fetch.shutdown()
+
+
+def test_stats_per_key(simple_key_dispatcher):
+    assert simple_key_dispatcher.get_stats() == {}  # disabled by default
+
+    simple_key_dispatcher.stats = True
+    simple_key_dispatcher("a")
+    simple_key_dispatcher("a")
+    with pytest.raises(KeyError):
+        simple_key_dispatcher("missing")
+    simple_key_dispatcher.dispatch_many(["b", "b"])
+
+    stats = simple_key_dispatcher.get_stats()
+    assert {key: (data["calls"], data["fallback_calls"], data["errors"]) for key, data in stats.items()} == {
+        "a": (2, 0, 0),
+        "missing": (1, 1, 1),
+        "b": (2, 0, 0),
+    }
+    assert sum(stats["a"]["histogram_ns"].values()) == 2
+
+    exported = json.loads(simple_key_dispatcher.stats_json())
+    assert set(exported["keys"]) == {"a", "b", "missing"}
+
+    simple_key_dispatcher.stats = False
+    simple_key_dispatcher("a")
+    assert simple_key_dispatcher.get_stats() == {}
+
+
+def test_stats_table_is_bounded(simple_key_dispatcher, monkeypatch):
+    monkeypatch.setattr(dispatch_module, "STATS_MAX_KEYS", 2)
+    simple_key_dispatcher.stats = True
+    simple_key_dispatcher("a")
+    for key in ["unknown1", "unknown2", "unknown3", "a"]:
+        with contextlib.suppress(KeyError):
+            simple_key_dispatcher(key)
+
+    stats = simple_key_dispatcher.get_stats()
+    assert {key: (data["calls"], data["fallback_calls"]) for key, data in stats.items()} == {
+        "a": (2, 0),
+        "unknown1": (1, 1),
+        dispatch_module.OTHER_KEYS: (2, 2),
+    }
+    assert set(json.loads(simple_key_dispatcher.stats_json())["keys"]) == {"a", "unknown1", "OTHER_KEYS"}
+
+
+def test_key_generator_cache():
+    calls = []
+
+    def normalize(value):
+        calls.append(value)
+        return str(value).strip().lower()
+
+    @Dispatcher
+    def route(value):
+        return "fallback"
+
+    route.register("a")(lambda value: "A")
+    route.key_generator = normalize
+    route.key_cache_size = 2
+
+    assert [route(value) for value in [" A", "a", " A", " A", "b"]] == ["A", "A", "A", "A", "fallback"]
+    assert calls == [" A", "a", "b"]
+    assert route.key_cache_info() == {"hits": 2, "misses": 3, "unhashable": 0, "maxsize": 2, "currsize": 2}
+
+    route("a")  # evicted by "b", as the least recently used
+    assert calls[-1] == "a"
+
+    assert route(["A"]) == "fallback"  # unhashable values are not cached
+    assert route.key_cache_info()["unhashable"] == 1
+
+    by_names = Dispatcher(lambda x, y: "fallback", key_names=["x", "y"], key_generator=lambda x, y: x + y)
+    by_names.key_cache_size = 0  # unbounded
+    by_names.register("ab")(lambda x, y: "AB")
+    assert [by_names(x="a", y="b"), by_names(x="a", y="b")] == ["AB", "AB"]
+    assert by_names.key_cache_info()["hits"] == 1
+
+    route.key_cache_size = None
+    assert route.key_cache_info()["misses"] == 0
+
+
+def test_range_dispatch():
+    @Dispatcher
+    def status_class(code):
+        return "unknown"
+
+    status_class.register_range(400, 500)(lambda code: "client error")
+    status_class.register_range(200, 300)(lambda code: "success")
+    status_class.register_range(500, 600)(lambda code: "server error")
+    status_class.register(404)(lambda code: "not found")
+
+    assert [status_class(code) for code in [200, 299, 300, 404, 418, 500, 599.5, 600, 100, "200"]] == [
+        "success",
+        "success",
+        "unknown",
+        "not found",  # exact keys take priority
+        "client error",
+        "server error",
+        "server error",
+        "unknown",
+        "unknown",
+        "unknown",  # not comparable with the bounds
+    ]
+    assert [lo for lo, _, _ in status_class.get_ranges()] == [200, 400, 500]
+
+    with pytest.raises(ValueError, match="overlaps the registered range \\[400, 500\\)"):
+        status_class.register_range(450, 460)
+    with pytest.raises(ValueError, match="overlaps the registered range \\[200, 300\\)"):
+        status_class.register_range(100, 201)
+    with pytest.raises(ValueError, match="Empty range"):
+        status_class.register_range(300, 300)
+    status_class.register_range(300, 400)(lambda code: "redirection")  # adjacent ranges do not overlap
+    assert status_class(301) == "redirection"
+
+    first, second = status_class.register_range(0, 10), status_class.register_range(5, 15)  # no overlap yet
+    first(lambda code: "first")
+    with pytest.raises(ValueError, match="overlaps the registered range \\[0, 10\\)"):
+        second(lambda code: "second")
+    assert status_class(7) == "first" and [lo for lo, _, _ in status_class.get_ranges()] == [0, 200, 300, 400, 500]
+
+
+def test_wildcard_keys():
+    @Dispatcher
+    def price(region, category, product):
+        return "default"
+
+    price.key_idx = [0, 2]
+    price.register(("eu", ANY))(lambda *args: "eu")
+    price.register((ANY, "x"))(lambda *args: "x")
+    price.register(("eu", "x"))(lambda *args: "eu-x")
+    price.register((ANY, ANY))(lambda *args: "any")
+
+    assert price("eu", "toys", "x") == "eu-x"  # exact key
+    assert price("eu", "toys", "y") == "eu"
+    assert price("us", "toys", "x") == "x"
+    assert price("us", "toys", "y") == "any"
+    assert price._wildcard_matches[("us", "y")] is price.registry[(ANY, ANY)]  # resolutions are cached
+
+    price.unregister(("eu", "x"))
+    assert price("eu", "toys", "x") == "eu"  # the first concrete position wins the tie
+
+    by_names = Dispatcher(lambda **kwargs: "default", key_names=["region", "product"])
+    by_names.register((ANY, "x"))(lambda **kwargs: "x")
+    assert by_names(region="us", product="x") == "x"
+    assert by_names(region="us", product="y") == "default"
+
+
+def test_bound_dispatcher(person_with_dispatcher):
+    alice = person_with_dispatcher("Alice")
+    talk = alice.talk
+    assert talk.__self__ is alice and talk.__func__ is person_with_dispatcher.talk
+    assert alice.talk("Bob") == "Alice says hi to Bob"
+    assert "talk" not in vars(alice)  # nothing is stored on the instance
+
+    class Slotted:
+        __slots__ = ("name",)
+        talk = person_with_dispatcher.talk
+
+        def __init__(self, name):
+            self.name = name
+
+    assert Slotted("Carol").talk("Alice") == "Carol says hi to Alice"
+
+
+def test_bound_dispatcher_follows_copies(person_with_dispatcher):
+    alice = person_with_dispatcher("Alice")
+    assert alice.talk("Bob") == "Alice says hi to Bob"
+    clone = copy.copy(alice)
+    clone.name = "Clone"
+    assert clone.talk("Bob") == "Clone says hi to Bob"
+    assert clone.talk.__self__ is clone
+
+
+def test_bound_dispatcher_does_not_keep_the_instance_alive(person_with_dispatcher):
+    alice = person_with_dispatcher("Alice")
+    alice.talk("Bob")
+    collected = weakref.ref(alice)
+    gc.disable()  # freed by reference counting alone: the cache creates no reference cycle
+    try:
+        del alice
+        assert collected() is None
+    finally:
+        gc.enable()
+
+
+def test_freeze(simple_key_dispatcher, unregistered_key, multi_arg_index_dispatcher):
+    frozen = simple_key_dispatcher.freeze()
+    assert frozen.__name__ == simple_key_dispatcher.__name__
+    assert frozen.dispatcher is simple_key_dispatcher
+    assert frozen("a") == simple_key_dispatcher("a")
+    with pytest.raises(unregistered_key):
+        frozen("missing")
+    with pytest.raises(ValueError, match="At least one"):
+        frozen()
+    with pytest.raises(RuntimeError, match="is frozen"):
+        simple_key_dispatcher.register("z")
+    with pytest.raises(RuntimeError, match="is frozen"):
+        simple_key_dispatcher.key_idx = 1
+
+    frozen_multi = multi_arg_index_dispatcher.freeze()
+    assert frozen_multi("a", "b", "x") == multi_arg_index_dispatcher("a", "b", "x")
+
+
+def test_freeze_locks_pending_decorators(simple_key_dispatcher):
+    register, register_range = simple_key_dispatcher.register("z"), simple_key_dispatcher.register_range(0, 10)
+    frozen = simple_key_dispatcher.freeze()
+    with pytest.raises(RuntimeError, match="is frozen"):
+        register(lambda value1, value2=None, value3=None: "z")
+    with pytest.raises(RuntimeError, match="is frozen"):
+        register_range(lambda value1, value2=None, value3=None: "range")
+    with pytest.raises(RuntimeError, match="is frozen"):
+        simple_key_dispatcher.unregister("a")
+    with pytest.raises(TypeError):
+        simple_key_dispatcher.registry["z"] = lambda value1: "z"
+    assert "z" not in simple_key_dispatcher.registry and simple_key_dispatcher.get_ranges() == ()
+    assert frozen("a") == simple_key_dispatcher("a") == "a"
+
+
+def test_owned_process_pool_does_not_fork():
+    @Dispatcher
+    def compute(value):
+        return "inline"
+
+    compute.register(str, executor="thread")(lambda value: value)
+    compute.register(int, executor="process")(square)
+    compute.key_generator = type
+    try:
+        assert compute("x").result() == "x"  # the thread pool runs when the process pool starts
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)  # "This process is multi-threaded, use of fork()..."
+            assert compute(7).result() == 49
+        assert compute.get_executor("process")._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        compute.shutdown()
+
+
+def test_executor_placement():
+    @Dispatcher
+    def compute(value):
+        return "inline"
+
+    compute.register(int, executor="process")(square)
+    compute.register(str, executor="thread")(lambda value: threading.current_thread().name)
+    compute.key_generator = type
+    with pytest.raises(ValueError, match="executor must be"):
+        compute.register(float, executor="gpu")
+
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        compute.set_executor("process", pool)
+        future = compute(7)
+        assert isinstance(future, Future) and future.result() == 49
+        assert compute("x").result() != threading.current_thread().name
+        assert compute(1.5) == "inline"
+
+        assert compute.dispatch_many([1, 2.0, 3, "x", 4], chunksize=2)[:4] == [1, "inline", 9, compute("x").result()]
+
+        compute.registry = {}
+        compute.register(int, batch=True, executor="process")(square_batch)
+        results = compute.dispatch_many(range(8), chunksize=3)
+        assert [result for result, _ in results] == [value * value for value in range(8)]
+        assert {pid for _, pid in results} != {os.getpid()}
+
+    compute.shutdown()
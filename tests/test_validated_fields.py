@@ -0,0 +1,148 @@
+import gc
+import importlib
+
+import pytest
+
+validated_fields = importlib.import_module("src.2025.08_August.validated_fields")
+Between = validated_fields.Between
+Check = validated_fields.Check
+Field = validated_fields.Field
+Matches = validated_fields.Matches
+MaxLen = validated_fields.MaxLen
+OneOf = validated_fields.OneOf
+Positive = validated_fields.Positive
+Typed = validated_fields.Typed
+Validated = validated_fields.Validated
+fields = validated_fields.fields
+
+
+# --- Test Fixtures ---
+
+
+class Quantity(Field):
+    validators = (Typed(int), Positive())
+
+
+class Order(Validated):
+    quantity = Quantity(Between(1, 100), default=1)
+    sku = Field(Typed(str), Matches(r"[A-Z]{3}-\d+"))
+    status = Field(OneOf("open", "closed"), default="open")
+
+
+class SlottedOrder(Validated):
+    __slots__ = ()
+    quantity = Quantity(default=1)
+    sku = Field(Typed(str), MaxLen(8))
+
+
+class PlainPoint:
+    x = Field(Typed(int, float), Check(lambda value: value == value, "a number, not NaN"))
+
+
+# --- Tests ---
+
+
+class TestField:
+
+    def test_valid_values_are_stored(self):
+        order = Order(quantity=3, sku="ABC-1")
+        assert (order.quantity, order.sku, order.status) == (3, "ABC-1", "open")
+        assert vars(order) == {"_quantity": 3, "_sku": "ABC-1"}
+        assert repr(order) == "Order(quantity=3, sku='ABC-1', status='open')"
+
+    @pytest.mark.parametrize(
+        "value, error, message",
+        [
+            ("3", TypeError, "Order.quantity must be an instance of int, got '3'"),
+            (0, ValueError, "Order.quantity must be positive, got 0"),
+            (101, ValueError, "Order.quantity must be between 1 and 100, got 101"),
+        ],
+    )
+    def test_first_failing_validator_raises(self, value, error, message):
+        order = Order()
+        with pytest.raises(error) as info:
+            order.quantity = value
+        assert str(info.value) == message
+        assert order.quantity == 1
+
+    def test_other_validators(self):
+        order = Order()
+        with pytest.raises(ValueError, match="matching"):
+            order.sku = "abc"
+        with pytest.raises(ValueError, match="one of"):
+            order.status = "lost"
+        point = PlainPoint()
+        point.x = 1.5
+        with pytest.raises(ValueError, match="not NaN"):
+            point.x = float("nan")
+        assert point.x == 1.5
+
+    def test_unset_field_without_default(self):
+        with pytest.raises(AttributeError, match="sku"):
+            _ = Order().sku
+        with pytest.raises(AttributeError, match="sku"):
+            _ = SlottedOrder().sku
+        assert repr(SlottedOrder()) == "SlottedOrder(quantity=1)"
+
+    def test_invalid_default_fails_at_class_creation(self):
+        with pytest.raises(ValueError, match="Bad.size must be positive"):
+
+            class Bad:
+                size = Field(Positive(), default=-1)
+
+    def test_check_without_assigning(self):
+        fields(Order)["quantity"].check(5)
+        with pytest.raises(ValueError):
+            fields(Order)["quantity"].check(500)
+
+    def test_introspection(self):
+        expected = "<Quantity Order.quantity(Typed(int), Positive(), Between(1, 100)) storage='dict'>"
+        assert repr(fields(Order)["quantity"]) == expected
+        assert list(Order._fields) == ["quantity", "sku", "status"]
+        assert type(Order.quantity) is property and Order.quantity.fget.field is fields(Order)["quantity"]
+
+    def test_unknown_keyword(self):
+        with pytest.raises(TypeError, match="no field 'price'"):
+            Order(price=3)
+
+
+class TestStorage:
+
+    def test_auto_picks_the_dict_or_a_registry(self):
+        assert fields(Order)["quantity"].storage == "dict" and fields(Order)["quantity"].registry is None
+        assert fields(SlottedOrder)["quantity"].storage == "registry"
+        assert fields(PlainPoint)["x"].storage == "dict"
+
+    def test_registry_storage(self):
+        order = SlottedOrder(quantity=2, sku="ABC")
+        assert (order.quantity, order.sku) == (2, "ABC")
+        with pytest.raises(ValueError, match="at most 8 long"):
+            order.sku = "ABCDEFGHI"
+        assert list(fields(SlottedOrder)["sku"].registry.keys()) == [order]
+        del order
+        gc.collect()
+        assert list(fields(SlottedOrder)["sku"].registry.keys()) == []
+
+    def test_storage_chosen_per_class(self):
+        class Point(Validated, storage="registry"):
+            x = Field(Typed(int), default=0)
+
+        point = Point(x=3)
+        assert point.x == 3 and vars(point) == {}
+        assert fields(Point)["x"].storage == "registry" and fields(Point)["x"].registry[point] == 3
+
+    def test_storage_must_be_available(self):
+        with pytest.raises(TypeError, match="has no __weakref__"):
+
+            class NoWeakref:
+                __slots__ = ("other",)
+                x = Field()
+
+        with pytest.raises(TypeError, match="instance dict"):
+
+            class NoDict(Validated, storage="dict"):
+                __slots__ = ()
+                x = Field()
+
+        with pytest.raises(ValueError, match="storage must be one of"):
+            Field(storage="column")